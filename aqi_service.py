@@ -0,0 +1,58 @@
+import numpy as np
+
+from batch_engine import create_batch_engine
+from system_artifact import load_or_build_engine
+
+
+class AQIService:
+    """
+    Layanan inferensi AQI yang aman dipakai bersama oleh banyak thread.
+
+    Semua state (fungsi keanggotaan, tabel rule) dibekukan menjadi array
+    read-only, dan setiap panggilan hanya memakai array lokal, jadi tidak ada
+    input/output yang tertukar antar sesi Streamlit dan tidak perlu lock.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        for array in self._arrays():
+            array.setflags(write=False)
+
+    def _arrays(self):
+        engine = self.engine
+        yield from engine.universes
+        yield from engine.term_mfs
+        yield engine.output_universe
+        yield engine.output_mfs
+        yield engine.output_used
+        yield engine.rules.antecedents
+        yield engine.rules.consequents
+
+    def evaluate(self, inputs):
+        """
+        Hitung AQI satu pembacaan. ``inputs`` berupa dict {label: nilai} atau
+        urutan enam nilai sesuai INPUT_LABELS.
+        """
+        if isinstance(inputs, dict):
+            inputs = [inputs[label] for label in self.engine.labels]
+        aqi_value = float(self.engine.compute(np.array([inputs], dtype=np.float64))[0])
+        if np.isnan(aqi_value):
+            raise ValueError(
+                "Nilai AQI tidak dapat dihitung karena tidak ada rule yang aktif untuk kombinasi input ini."
+            )
+        return aqi_value
+
+    def evaluate_batch(self, data):
+        """Hitung AQI banyak pembacaan sekaligus (NaN bila tidak ada rule aktif)"""
+        return self.engine.compute(data)
+
+
+def create_aqi_service(artifact_path=None, **engine_options):
+    """
+    Bangun AQIService dari sistem fuzzy aplikasi. Dengan ``artifact_path``
+    mesin dimuat dari artefak hasil system_artifact.py (dibuat bila belum ada
+    atau sudah usang).
+    """
+    if artifact_path is not None:
+        return AQIService(load_or_build_engine(artifact_path, **engine_options))
+    return AQIService(create_batch_engine(**engine_options))
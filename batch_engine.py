@@ -0,0 +1,317 @@
+import os
+
+import numpy as np
+
+from analytic_centroid import AnalyticCentroid
+from instrumentation import INSTRUMENTATION
+from membership_tables import MembershipTables
+from rule_compiler import CompiledRules, compile_rules
+
+
+class BatchAQIEngine:
+    """
+    Mesin inferensi Mamdani berbasis array untuk banyak pembacaan sekaligus.
+
+    Hasilnya sama dengan ``ControlSystemSimulation.compute()`` dari scikit-fuzzy
+    (fuzzifikasi ``np.interp``, AND = min, akumulasi = max, centroid pada
+    universe yang di-upsample), hanya saja semua baris dihitung sekaligus.
+    Baris tanpa rule yang aktif, atau dengan input NaN/tak hingga, menghasilkan NaN.
+
+    Dengan ``lookup_tables=True`` fuzzifikasi input bilangan bulat dibaca dari
+    MembershipTables (float32), sehingga hasilnya bisa berbeda sangat sedikit.
+    Dengan ``defuzzify_method="analytic"`` centroid dihitung oleh
+    AnalyticCentroid (lihat TOLERANCE di analytic_centroid.py).
+    Dengan ``sparse_rules=True`` hanya rule yang semua antecedent-nya aktif
+    yang dinyalakan (CompiledRules.fire_sparse); hasilnya identik.
+    """
+
+    def __init__(
+        self,
+        antecedents,
+        consequent,
+        rules,
+        block_size=4096,
+        lookup_tables=False,
+        defuzzify_method="centroid",
+        sparse_rules=False,
+    ):
+        # Rule disimpan sebagai tabel integer; bisa juga diberikan langsung
+        # dalam bentuk CompiledRules (misalnya hasil CompiledRules.load)
+        if isinstance(rules, CompiledRules):
+            rules.check_variables(antecedents, consequent)
+        else:
+            rules = compile_rules(rules, antecedents, consequent)
+
+        self._setup(
+            labels=[var.label for var in antecedents],
+            universes=[var.universe for var in antecedents],
+            term_labels=[list(var.terms) for var in antecedents],
+            term_mfs=[[term.mf for term in var.terms.values()] for var in antecedents],
+            output_universe=consequent.universe,
+            output_terms=list(consequent.terms),
+            output_mfs=[term.mf for term in consequent.terms.values()],
+            rules=rules,
+            block_size=block_size,
+            lookup_tables=lookup_tables,
+            defuzzify_method=defuzzify_method,
+            sparse_rules=sparse_rules,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, labels, universes, term_labels, term_mfs, output_universe, output_terms, output_mfs, rules, **options
+    ):
+        """
+        Bangun mesin langsung dari array (misalnya hasil memmap, lihat
+        system_artifact.py) tanpa objek variabel scikit-fuzzy.
+        """
+        if (
+            tuple(labels) != rules.variable_labels
+            or tuple(tuple(t) for t in term_labels) != rules.term_labels
+            or tuple(output_terms) != rules.output_terms
+        ):
+            raise ValueError("Tabel rule tidak cocok dengan variabel fuzzy")
+        engine = cls.__new__(cls)
+        engine._setup(
+            labels, universes, term_labels, term_mfs, output_universe, output_terms, output_mfs, rules, **options
+        )
+        return engine
+
+    def _setup(
+        self,
+        labels,
+        universes,
+        term_labels,
+        term_mfs,
+        output_universe,
+        output_terms,
+        output_mfs,
+        rules,
+        block_size=4096,
+        lookup_tables=False,
+        defuzzify_method="centroid",
+        sparse_rules=False,
+    ):
+        if defuzzify_method not in ("centroid", "analytic"):
+            raise ValueError(f"Metode defuzzifikasi tidak dikenal: {defuzzify_method}")
+        self.block_size = block_size
+        self.sparse_rules = sparse_rules
+        self.labels = tuple(labels)
+        # asarray tidak menyalin array float64 (termasuk memmap)
+        self.universes = [np.asarray(universe, dtype=np.float64) for universe in universes]
+        self.term_labels = [list(terms) for terms in term_labels]
+        self.term_mfs = [np.asarray(mfs, dtype=np.float64) for mfs in term_mfs]
+
+        self.output_universe = np.asarray(output_universe, dtype=np.float64)
+        self.output_terms = list(output_terms)
+        self.output_mfs = np.asarray(output_mfs, dtype=np.float64)
+        self.rules = rules
+
+        self.tables = None
+        if lookup_tables:
+            self.tables = MembershipTables(
+                self.labels, self.universes, self.term_mfs, self.rules.max_terms
+            )
+
+        # Titik potong dicari dengan searchsorted, jadi term output harus unimodal
+        self._output_peaks = [int(np.argmax(mf)) for mf in self.output_mfs]
+        for label, mf, peak in zip(self.output_terms, self.output_mfs, self._output_peaks):
+            if np.any(np.diff(mf[: peak + 1]) < 0) or np.any(np.diff(mf[peak:]) > 0):
+                raise ValueError(f"Fungsi keanggotaan output '{label}' harus unimodal")
+
+        # Term output yang tidak dipakai rule manapun diabaikan scikit-fuzzy
+        self.output_used = self.rules.used_outputs
+
+        self.analytic = None
+        if defuzzify_method == "analytic":
+            self.analytic = AnalyticCentroid(self.output_universe, self.output_mfs[self.output_used])
+
+    def fuzzify(self, inputs):
+        """Hitung derajat keanggotaan tiap term, array (n, n_variabel, max_term)"""
+        if self.tables is not None:
+            return self.tables.lookup(inputs)
+        memberships = np.zeros((inputs.shape[0], len(self.universes), self.rules.max_terms))
+        for i, (universe, mfs) in enumerate(zip(self.universes, self.term_mfs)):
+            # Sama seperti clip_to_bounds pada ControlSystemSimulation
+            x = np.clip(inputs[:, i], universe[0], universe[-1])
+            for j, mf in enumerate(mfs):
+                memberships[:, i, j] = np.interp(x, universe, mf, left=0.0, right=0.0)
+        return memberships
+
+    def fire_rules(self, memberships):
+        """Kekuatan akhir tiap term output (n, n_output_terms) via min lalu max"""
+        if self.sparse_rules:
+            return self.rules.fire_sparse(memberships)
+        return self.rules.fire(memberships)
+
+    def _crossings(self, k, y):
+        """
+        Titik di mana term output ke-k sama dengan potongannya ``y`` (n,), setara
+        ``_interp_universe_fast`` tetapi memakai searchsorted karena fungsinya unimodal.
+        """
+        universe, mf = self.output_universe, self.output_mfs[k]
+        peak = self._output_peaks[k]
+        rising, falling = mf[: peak + 1], -mf[peak:]
+        zero = y == 0.0
+        # Untuk potongan nol scikit-fuzzy memakai mf > y, selainnya mf >= y
+        first = np.where(
+            zero, np.searchsorted(rising, y, side="right"), np.searchsorted(rising, y, side="left")
+        )
+        count = np.where(
+            zero, np.searchsorted(falling, -y, side="left"), np.searchsorted(falling, -y, side="right")
+        )
+        last = peak + count - 1
+        empty = first > peak
+
+        points = []
+        for idx, valid in ((first - 1, (first >= 1) & ~empty), (last, (last < mf.size - 1) & ~empty)):
+            idx = np.clip(idx, 0, mf.size - 2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x = universe[idx] + (y - mf[idx]) * (universe[idx + 1] - universe[idx]) / (mf[idx + 1] - mf[idx])
+            # Slot kosong diisi universe[0] sehingga hanya menjadi segmen selebar nol
+            points.append(np.where(valid, x, universe[0]))
+        return points
+
+    def defuzzify(self, cuts):
+        """Centroid dari agregasi term output yang dipotong, seperti scikit-fuzzy"""
+        universe = self.output_universe
+        used = np.flatnonzero(self.output_used)
+        n = cuts.shape[0]
+
+        extra = [x for k in used for x in self._crossings(k, cuts[:, k])]
+        extra = np.stack(extra, axis=1)
+
+        # Nilai fungsi keanggotaan output (max dari term yang dipotong) di titik
+        # universe dan di titik tambahan
+        grid_mf = np.zeros((n, universe.size))
+        extra_mf = np.zeros_like(extra)
+        for k in used:
+            cut = cuts[:, k][:, None]
+            np.fmax(grid_mf, np.fmin(cut, self.output_mfs[k]), out=grid_mf)
+            np.fmax(
+                extra_mf,
+                np.fmin(cut, np.interp(extra, universe, self.output_mfs[k], left=0.0, right=0.0)),
+                out=extra_mf,
+            )
+
+        points = np.concatenate([np.broadcast_to(universe, (n, universe.size)), extra], axis=1)
+        output_mf = np.concatenate([grid_mf, extra_mf], axis=1)
+        order = np.argsort(points, axis=1, kind="stable")
+        points = np.take_along_axis(points, order, axis=1)
+        output_mf = np.take_along_axis(output_mf, order, axis=1)
+
+        # Centroid eksak untuk fungsi linear per segmen (skfuzzy.defuzzify.centroid)
+        x1, x2 = points[:, :-1], points[:, 1:]
+        y1, y2 = output_mf[:, :-1], output_mf[:, 1:]
+        width = x2 - x1
+        sum_area = (0.5 * width * (y1 + y2)).sum(axis=1)
+        sum_moment_area = (width * (x1 * (2.0 * y1 + y2) + x2 * (y1 + 2.0 * y2))).sum(axis=1) / 6.0
+        result = sum_moment_area / np.fmax(sum_area, np.finfo(float).eps)
+
+        # Tidak ada rule yang aktif -> scikit-fuzzy melempar error
+        result[output_mf.sum(axis=1) == 0] = np.nan
+        return result
+
+    def defuzzify_cuts(self, cuts):
+        """AQI dari kekuatan term output (n, n_output_terms) dengan metode defuzzifikasi mesin"""
+        if self.analytic is None:
+            return self.defuzzify(cuts)
+        return self.analytic(cuts[:, self.output_used])
+
+    def compute(self, data):
+        """
+        Hitung AQI untuk banyak pembacaan.
+
+        ``data`` berupa array (n, 6) dengan urutan kolom INPUT_LABELS, atau
+        DataFrame yang memiliki kolom-kolom tersebut. Mengembalikan array AQI (n,);
+        baris dengan input NaN atau tak hingga tidak dihitung dan bernilai NaN.
+        """
+        if hasattr(data, "columns"):
+            data = data[list(self.labels)].to_numpy()
+        inputs = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        if inputs.shape[1] != len(self.labels):
+            raise ValueError(f"Input harus memiliki {len(self.labels)} kolom: {', '.join(self.labels)}")
+        if inputs.shape[0] == 0:
+            return np.empty(0)
+        # np.clip dan np.interp meneruskan NaN ke min/max rule sehingga hasilnya
+        # tampak valid; baris seperti itu dibuang sebelum fuzzifikasi
+        valid = np.isfinite(inputs).all(axis=1)
+        rows = inputs if valid.all() else inputs[valid]
+        # Defuzzifikasi memakai array (n, titik universe), jadi diproses per blok
+        values = np.empty(rows.shape[0])
+        stage = INSTRUMENTATION.stage
+        for start in range(0, rows.shape[0], self.block_size):
+            block = rows[start : start + self.block_size]
+            with stage("fuzzify"):
+                memberships = self.fuzzify(block)
+            with stage("fire_rules"):
+                cuts = self.fire_rules(memberships)
+            with stage("defuzzify"):
+                values[start : start + self.block_size] = self.defuzzify_cuts(cuts)
+        if rows is inputs:
+            result = values
+        else:
+            result = np.full(inputs.shape[0], np.nan)
+            result[valid] = values
+        INSTRUMENTATION.count("rows", inputs.shape[0])
+        return result
+
+
+def create_batch_engine(
+    rules_path=None, lookup_tables=False, defuzzify_method="centroid", resolution=None, sparse_rules=False
+):
+    """
+    Bangun BatchAQIEngine dari fungsi keanggotaan dan rule aplikasi.
+    Bila ``rules_path`` diberikan (akhiran .npz ditambahkan bila belum ada),
+    tabel rule hasil kompilasi disimpan di sana bersama hash versinya (lihat
+    system_artifact.version_hash) dan dipakai ulang selama hash itu sama;
+    bila berbeda, tabel dikompilasi dan ditulis ulang. File .npz tanpa hash
+    versi (misalnya hasil ``rule_grid.py --output``) dan file .csv (lihat
+    rule_table.py) dibaca sebagai tabel rule apa adanya dan tidak pernah
+    ditimpa. ``resolution`` mengatur universe tiap variabel (lihat
+    variables.make_universe).
+    """
+    # Diimpor di sini agar modul ini (dan system_artifact) bisa dipakai tanpa
+    # memuat scikit-fuzzy
+    from rule_table import load_rule_table
+    from rules import create_rules
+    from system_artifact import version_hash
+    from variables import INPUT_LABELS, create_variables
+
+    pm25, pm10, co, no2, o3, so2, aqi = create_variables(resolution)
+    rules = None
+    if rules_path is not None and rules_path.endswith(".csv"):
+        rules = load_rule_table(rules_path)
+    elif rules_path is not None:
+        # np.savez menambahkan .npz, jadi path yang diperiksa harus sama
+        if not rules_path.endswith(".npz"):
+            rules_path += ".npz"
+        if os.path.exists(rules_path):
+            version = CompiledRules.saved_version(rules_path)
+            if version is None or version == version_hash():
+                try:
+                    rules = CompiledRules.load(rules_path)
+                except (OSError, ValueError, KeyError) as e:
+                    raise ValueError(f"{rules_path} bukan tabel rule; file tidak ditimpa") from e
+    if rules is None:
+        # Tabel belum ada atau dibuat dari rules.py/variables.py versi lain
+        rules = create_rules(pm25, pm10, co, no2, o3, so2, aqi)
+        if rules_path is not None:
+            rules = compile_rules(rules, (pm25, pm10, co, no2, o3, so2), aqi)
+            rules.save(rules_path, version=version_hash())
+    antecedents = (pm25, pm10, co, no2, o3, so2)
+    assert tuple(var.label for var in antecedents) == INPUT_LABELS
+    return BatchAQIEngine(
+        antecedents,
+        aqi,
+        rules,
+        lookup_tables=lookup_tables,
+        defuzzify_method=defuzzify_method,
+        sparse_rules=sparse_rules,
+    )
+
+
+def compute_aqi_batch(pm25, pm10, co, no2, o3, so2, engine=None):
+    """Hitung AQI dari enam array polutan sekaligus"""
+    engine = engine or create_batch_engine()
+    return engine.compute(np.column_stack([pm25, pm10, co, no2, o3, so2]))
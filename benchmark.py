@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from batch_engine import BatchAQIEngine, create_batch_engine
+from rule_compiler import compile_rules
+from rules import create_rules
+from system_artifact import load_or_build_engine, version_hash
+from variables import INPUT_BREAKPOINTS, INPUT_LABELS, INPUT_RANGES, create_variables
+
+# Sampel input tetap agar hasil bisa dibandingkan antar commit, di wilayah
+# tempat rule-rule berada (variables.INPUT_RANGES)
+SEED = 20240101
+BATCH_SIZES = (1, 100, 10_000, 100_000)
+# Metrik yang terlalu berisik (atau bukan ukuran kinerja) untuk dibandingkan
+NOISY_METRICS = (".n", ".max", ".p99", "max_rss_bytes")
+# Kelompok impor yang diukur di proses baru: yang dimuat main.py saat start,
+# saat halaman kalkulator/informasi dibuka, dan impor eager sebelumnya
+IMPORT_GROUPS = {
+    "streamlit": ("streamlit",),
+    "app_shell": ("aqi_categories", "result_cache"),
+    "calculator_page": ("aqi_service", "system_artifact", "variables", "gauge", "plotly.graph_objects"),
+    "info_page": ("pandas",),
+    "dashboard_page": ("stations",),
+    "eager_before": (
+        "aqi_categories", "result_cache", "pandas", "aqi_service", "variables", "skfuzzy", "plotly.graph_objects"
+    ),
+}
+# Pengaturan resolusi universe yang dibandingkan dengan grid 1 satuan
+RESOLUTIONS = {
+    "inputs_breakpoints": INPUT_BREAKPOINTS,
+    "breakpoints": "breakpoints",
+    "points_1000": 1000,
+}
+
+
+def sample_inputs(n, seed=SEED):
+    """Pembacaan acak (n, 6) yang selalu sama untuk seed yang sama"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, np.array(INPUT_RANGES) + 1, size=(n, len(INPUT_LABELS))).astype(np.float64)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_imports(groups=IMPORT_GROUPS, repeat=3):
+    """
+    Waktu impor tiap kelompok modul di interpreter baru (nilai terbaik dari
+    ``repeat``). Modul yang tidak terpasang dilewati dan dicatat di ``missing``.
+    """
+    script = (
+        "import importlib, json, sys, time\n"
+        "missing, start = [], time.perf_counter()\n"
+        "for name in sys.argv[1:]:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except ImportError:\n"
+        "        missing.append(name)\n"
+        "print(json.dumps({'seconds': time.perf_counter() - start, 'missing': missing}))\n"
+    )
+    results = {}
+    for name, modules in groups.items():
+        runs = [
+            json.loads(
+                subprocess.check_output(
+                    [sys.executable, "-c", script, *modules],
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                    text=True,
+                )
+            )
+            for _ in range(repeat)
+        ]
+        results[name] = {"seconds": min(run["seconds"] for run in runs), "missing": runs[0]["missing"]}
+    return results
+
+
+def bench_cold_start(repeat=3):
+    """Waktu membangun sistem, dipecah per tahap (nilai terbaik dari ``repeat``)"""
+    stages = {}
+    for _ in range(repeat):
+        variables, t_vars = _timed(create_variables)
+        rules, t_rules = _timed(create_rules, *variables)
+        compiled, t_compile = _timed(compile_rules, rules, variables[:6], variables[6])
+        _, t_engine = _timed(BatchAQIEngine, variables[:6], variables[6], compiled)
+        for name, value in (
+            ("membership_functions", t_vars),
+            ("create_rules", t_rules),
+            ("compile_rules", t_compile),
+            ("engine_init", t_engine),
+        ):
+            stages[name] = min(stages.get(name, float("inf")), value)
+    stages["total"] = sum(stages.values())
+    return stages
+
+
+def bench_artifact_start(repeat=3):
+    """
+    Jalur start aplikasi (initialize_fuzzy_system): load_or_build_engine
+    dengan resolution=INPUT_BREAKPOINTS. Diukur saat artefak belum ada
+    (bangun lalu simpan), saat artefak sudah ada (memory-map), dan proses
+    baru yang mengimpor system_artifact lalu memuat artefak (nilai terbaik
+    dari ``repeat``).
+    """
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from system_artifact import load_or_build_engine\n"
+        "from variables import INPUT_BREAKPOINTS\n"
+        "load_or_build_engine(sys.argv[1], resolution=INPUT_BREAKPOINTS)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    stages = {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as parent:
+            path = os.path.join(parent, "aqi_system")
+            _, t_build = _timed(load_or_build_engine, path, resolution=INPUT_BREAKPOINTS)
+            _, t_load = _timed(load_or_build_engine, path, resolution=INPUT_BREAKPOINTS)
+            t_process = float(
+                subprocess.check_output(
+                    [sys.executable, "-c", script, path], cwd=os.path.dirname(os.path.abspath(__file__)), text=True
+                )
+            )
+        for name, value in (("build_and_save", t_build), ("load", t_load), ("load_new_process", t_process)):
+            stages[name] = min(stages.get(name, float("inf")), value)
+    return stages
+
+
+def bench_skfuzzy(n_readings=3):
+    """
+    Jalur scikit-fuzzy asli: ctrl.ControlSystem(rules) dan compute() per baris.
+    Sangat lambat (pembangunan graf bisa memakan beberapa menit).
+    """
+    from skfuzzy import control as ctrl
+
+    variables = create_variables()
+    rules = create_rules(*variables)
+    system, t_system = _timed(ctrl.ControlSystem, rules)
+    simulation = ctrl.ControlSystemSimulation(system)
+    latencies = []
+    for row in sample_inputs(n_readings):
+        for label, value in zip(INPUT_LABELS, row):
+            simulation.input[label] = value
+        try:
+            _, elapsed = _timed(simulation.compute)
+        except ValueError:
+            continue
+        latencies.append(elapsed)
+    return {"control_system_init": t_system, "compute_mean": float(np.mean(latencies)) if latencies else None}
+
+
+def bench_latency(engine, n=2000):
+    """Persentil latensi satu pembacaan (detik)"""
+    inputs = sample_inputs(n, seed=SEED + 1)
+    engine.compute(inputs[:1])
+    latencies = np.empty(n)
+    for i, row in enumerate(inputs):
+        start = time.perf_counter()
+        engine.compute(row[None, :])
+        latencies[i] = time.perf_counter() - start
+    return {
+        "n": n,
+        "p50": float(np.percentile(latencies, 50)),
+        "p90": float(np.percentile(latencies, 90)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max()),
+    }
+
+
+def bench_throughput(engine, sizes=BATCH_SIZES, min_time=0.5):
+    """Baris per detik untuk beberapa ukuran batch"""
+    results = {}
+    for size in sizes:
+        inputs = sample_inputs(size, seed=SEED + 2)
+        runs, elapsed = 0, 0.0
+        while elapsed < min_time or runs < 2:
+            _, t = _timed(engine.compute, inputs)
+            elapsed += t
+            runs += 1
+        results[str(size)] = {"rows_per_second": size * runs / elapsed, "seconds_per_batch": elapsed / runs}
+    return results
+
+
+def bench_resolution(resolutions=RESOLUTIONS, n=10_000):
+    """
+    Biaya dan akurasi tiap resolusi universe dibanding grid 1 satuan: waktu
+    membangun mesin, waktu compute ``n`` baris, selisih AQI maksimum/rata-rata
+    dan jumlah baris yang status NaN-nya berubah.
+    """
+    # Nilai pecahan agar titik di antara grid juga teruji
+    inputs = sample_inputs(n, seed=SEED + 3) + np.random.default_rng(SEED + 3).random((n, len(INPUT_LABELS)))
+    results = {}
+    for method in ("centroid", "analytic"):
+        reference, t_build = _timed(create_batch_engine, defuzzify_method=method)
+        expected, t_compute = _timed(reference.compute, inputs)
+        results[method] = {"grid": {"build_seconds": t_build, "compute_seconds": t_compute}}
+        for name, resolution in resolutions.items():
+            engine, t_build = _timed(create_batch_engine, defuzzify_method=method, resolution=resolution)
+            values, t_compute = _timed(engine.compute, inputs)
+            both = ~np.isnan(expected) & ~np.isnan(values)
+            error = np.abs(values[both] - expected[both])
+            results[method][name] = {
+                "build_seconds": t_build,
+                "compute_seconds": t_compute,
+                "max_error": float(error.max()) if error.size else 0.0,
+                "mean_error": float(error.mean()) if error.size else 0.0,
+                "nan_mismatch": int((np.isnan(expected) != np.isnan(values)).sum()),
+            }
+    return results
+
+
+def bench_memory():
+    """Memori yang dialokasikan saat membangun sistem dan ukuran array mesin"""
+    tracemalloc.start()
+    variables = create_variables()
+    rules = create_rules(*variables)
+    engine = BatchAQIEngine(variables[:6], variables[6], rules)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    engine_bytes = sum(a.nbytes for a in engine.universes) + sum(a.nbytes for a in engine.term_mfs)
+    engine_bytes += engine.output_universe.nbytes + engine.output_mfs.nbytes
+    engine_bytes += engine.rules.antecedents.nbytes + engine.rules.consequents.nbytes
+    return {
+        "build_peak_bytes": peak,
+        "engine_array_bytes": engine_bytes,
+        # ru_maxrss dalam KiB di Linux
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def run(skfuzzy=False, quick=False):
+    variables = create_variables()
+    rules = create_rules(*variables)
+    engines = {
+        "exact": BatchAQIEngine(variables[:6], variables[6], rules),
+        "sparse": BatchAQIEngine(variables[:6], variables[6], rules, sparse_rules=True),
+        "fast": BatchAQIEngine(
+            variables[:6], variables[6], rules, lookup_tables=True, defuzzify_method="analytic"
+        ),
+    }
+    sizes = BATCH_SIZES[:3] if quick else BATCH_SIZES
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "source_hash": version_hash(),
+            "n_rules": len(rules),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "cold_start": bench_cold_start(),
+        "artifact_start": bench_artifact_start(repeat=1 if quick else 3),
+        "latency": {name: bench_latency(e, n=200 if quick else 2000) for name, e in engines.items()},
+        "throughput": {name: bench_throughput(e, sizes) for name, e in engines.items()},
+        "memory": bench_memory(),
+        "resolution": bench_resolution(n=2000 if quick else 10_000),
+        "imports": bench_imports(repeat=1 if quick else 3),
+    }
+    if skfuzzy:
+        report["skfuzzy"] = bench_skfuzzy()
+    return report
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(report, baseline, threshold=0.10):
+    """
+    Bandingkan dua laporan. Mengembalikan daftar (metrik, lama, baru, rasio)
+    yang memburuk lebih dari ``threshold``.
+    """
+    old = dict(_flatten(baseline))
+    regressions = []
+    for name, new in _flatten(report):
+        if name.startswith("meta.") or name.endswith(NOISY_METRICS) or name not in old or not old[name]:
+            continue
+        ratio = new / old[name]
+        # Untuk throughput makin besar makin baik, selainnya makin kecil
+        worse = ratio < 1 - threshold if "rows_per_second" in name else ratio > 1 + threshold
+        if worse:
+            regressions.append((name, old[name], new, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur inferensi AQI")
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Laporan JSON sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Batas regresi relatif (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="Sampel lebih kecil untuk pengecekan cepat")
+    parser.add_argument(
+        "--skfuzzy", action="store_true", help="Ikut ukur ctrl.ControlSystem asli (bisa beberapa menit)"
+    )
+    args = parser.parse_args(argv)
+
+    report = run(skfuzzy=args.skfuzzy, quick=args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("source_hash") != report["meta"]["source_hash"]:
+            print("Catatan: rule/fungsi keanggotaan berbeda dari baseline", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESI {name}: {old:.6g} -> {new:.6g} ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
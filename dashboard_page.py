@@ -0,0 +1,111 @@
+import os
+
+import streamlit as st
+
+from aqi_categories import AQI_CATEGORIES
+from instrumentation import INSTRUMENTATION
+from result_cache import ResultCache
+
+# File stasiun di server (CSV/Parquet) yang boleh dipilih: satu file dan/atau
+# semua file di satu direktori. Path bebas dari browser tidak diterima.
+STATIONS_FILE = os.environ.get("AQI_STATIONS_FILE", "")
+STATIONS_DIR = os.environ.get("AQI_STATIONS_DIR", "")
+STATIONS_EXTENSIONS = (".csv", ".parquet", ".pq")
+# Jumlah file yang hasilnya disimpan dan umurnya (detik, 0 = tanpa batas)
+DASHBOARD_CACHE_SIZE = int(os.environ.get("AQI_DASHBOARD_CACHE_SIZE", "16"))
+DASHBOARD_CACHE_TTL = float(os.environ.get("AQI_DASHBOARD_CACHE_TTL", "3600")) or None
+
+
+@st.cache_resource
+def get_dashboard_cache():
+    """Hasil penilaian per hash isi file stasiun, dibagi ke semua sesi"""
+    return INSTRUMENTATION.register_cache(
+        "dashboard", ResultCache(maxsize=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL)
+    )
+
+
+def _server_files():
+    """File stasiun di server yang dikonfigurasi lewat AQI_STATIONS_FILE / AQI_STATIONS_DIR"""
+    files = [STATIONS_FILE] if STATIONS_FILE else []
+    if STATIONS_DIR and os.path.isdir(STATIONS_DIR):
+        for name in sorted(os.listdir(STATIONS_DIR)):
+            path = os.path.join(STATIONS_DIR, name)
+            if name.lower().endswith(STATIONS_EXTENSIONS) and os.path.isfile(path) and path not in files:
+                files.append(path)
+    return files
+
+
+def _load_file():
+    """Isi dan nama file stasiun dari unggahan atau file server yang dikonfigurasi (None bila belum ada)"""
+    uploaded = st.file_uploader("Unggah file stasiun (CSV/Parquet)", type=["csv", "parquet"])
+    if uploaded is not None:
+        return uploaded.getvalue(), uploaded.name
+    files = _server_files()
+    if not files:
+        return None
+    path = st.selectbox("Atau file stasiun di server", files, format_func=os.path.basename)
+    try:
+        with open(path, "rb") as f:
+            return f.read(), path
+    except OSError:
+        st.error(f"File stasiun tidak bisa dibaca: {os.path.basename(path)}")
+        return None
+
+
+def show_dashboard_page(aqi_system):
+    st.markdown(
+        """
+        <h1 style='text-align: center; color: #1E88E5; margin-bottom: 16px;'>
+            Dashboard Stasiun
+        </h1>
+    """,
+        unsafe_allow_html=True,
+    )
+    st.write(
+        "File berisi satu baris per stasiun: nama stasiun (station), koordinat (lat, lon), "
+        "dan pembacaan terakhir PM2.5, PM10, CO, NO2, O3, SO2."
+    )
+
+    loaded = _load_file()
+    if loaded is None:
+        return
+    data, name = loaded
+
+    from stations import content_hash, read_stations, score_stations
+
+    try:
+        with INSTRUMENTATION.request("dashboard"):
+            # Semua stasiun dinilai dalam satu panggilan; file yang sama
+            # (menurut hash isinya) tidak dinilai ulang pada rerun berikutnya
+            stations = get_dashboard_cache().get_or_compute(
+                content_hash(data), lambda: score_stations(aqi_system, read_stations(data, name))
+            )
+    except ValueError as e:
+        st.error(f"File stasiun tidak valid: {str(e)}")
+        return
+
+    counts = stations["Kategori"].value_counts()
+    columns = st.columns(len(AQI_CATEGORIES) + 1)
+    for column, (_, color, category) in zip(columns, AQI_CATEGORIES):
+        column.markdown(
+            f"<div style='text-align: center; padding: 8px; background-color: {color}; border-radius: 10px;'>"
+            f"<b>{category}</b><br>{counts.get(category, 0):,}</div>",
+            unsafe_allow_html=True,
+        )
+    columns[-1].markdown(
+        "<div style='text-align: center; padding: 8px; background-color: #BDBDBD; border-radius: 10px;'>"
+        f"<b>Tidak dapat dihitung</b><br>{counts.get('Tidak dapat dihitung', 0):,}</div>",
+        unsafe_allow_html=True,
+    )
+
+    categories = [category for _, _, category in AQI_CATEGORIES] + ["Tidak dapat dihitung"]
+    selected = st.multiselect("Tampilkan kategori", categories, default=categories)
+    shown = stations[stations["Kategori"].isin(selected)]
+
+    # Satu layer peta untuk semua stasiun, warna per titik dari palet kategori
+    st.map(shown, latitude="lat", longitude="lon", color="color", size=200)
+    st.dataframe(
+        shown.drop(columns=["color"]).sort_values("AQI", ascending=False),
+        use_container_width=True,
+        hide_index=True,
+    )
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from aqi_categories import AQI_CATEGORIES, category_color
+from result_cache import ResultCache
+
+GAUGE_TITLE = "Indeks Kualitas Udara (AQI)"
+GAUGE_MAX = 300
+# Jumlah figure (per nilai AQI yang dibulatkan) yang disimpan per template
+# dan umurnya (detik, 0 = tanpa batas)
+GAUGE_CACHE_SIZE = int(os.environ.get("AQI_GAUGE_CACHE_SIZE", "512"))
+GAUGE_CACHE_TTL = float(os.environ.get("AQI_GAUGE_CACHE_TTL", "0")) or None
+
+
+def gauge_steps():
+    """Pita warna gauge sesuai kategori AQI pada rentang 0-GAUGE_MAX"""
+    steps = []
+    lower = 0
+    for upper, color, _ in AQI_CATEGORIES:
+        steps.append({"range": [lower, min(upper, GAUGE_MAX)], "color": color})
+        lower = upper
+    return steps
+
+
+def build_gauge_figure(value, title=GAUGE_TITLE, height=300):
+    """Bangun figure gauge lengkap dari awal (cara lama, juga dipakai template)"""
+    import plotly.graph_objects as go
+
+    color, _ = category_color(value)
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=value,
+            number={"valueformat": ".1f"},
+            domain={"x": [0, 1], "y": [0, 1]},
+            title={"text": title},
+            gauge={
+                "axis": {"range": [0, GAUGE_MAX]},
+                "bar": {"color": color},
+                "steps": gauge_steps(),
+            },
+        )
+    )
+    fig.update_layout(height=height)
+    return fig
+
+
+class GaugeTemplate:
+    """
+    Struktur gauge (indikator, pita kategori, layout dan template tema)
+    dibangun dan divalidasi sekali; tiap hasil hanya mengganti nilai dan
+    warna bar. Membuat figure dengan go.Figure(...) biasa memvalidasi ulang
+    seluruh template tema sehingga jauh lebih lambat, bahkan saat menyalin
+    figure yang sudah ada.
+
+    Nilai dibulatkan ke 0.1 (sama dengan tampilan), tetapi warna bar diambil
+    dari nilai sebelum dibulatkan (atau ``color`` dari pemanggil) agar sama
+    dengan kategori yang ditampilkan; figure per (nilai, warna) disimpan di
+    ResultCache berukuran ``cache_size`` dengan umur ``ttl`` detik (lihat
+    ``cache``). Figure yang dikembalikan dibagi antar pemanggil, jadi jangan
+    diubah.
+    """
+
+    def __init__(self, title=GAUGE_TITLE, height=300, cache_size=GAUGE_CACHE_SIZE, ttl=GAUGE_CACHE_TTL):
+        spec = build_gauge_figure(0.0, title, height).to_dict()
+        self._trace = spec["data"][0]
+        self._layout = spec["layout"]
+        self.cache = ResultCache(maxsize=cache_size, ttl=ttl)
+
+    def figure(self, value, color=None):
+        """Figure gauge untuk nilai AQI ``value``; ``color`` default dari category_color(value)"""
+        if color is None:
+            color, _ = category_color(value)
+        value = round(float(value), 1)
+        return self.cache.get_or_compute((value, color), lambda: self._patch(value, color))
+
+    def _patch(self, value, color):
+        import plotly.graph_objects as go
+
+        gauge = self._trace["gauge"]
+        trace = dict(self._trace, value=value, gauge=dict(gauge, bar=dict(gauge["bar"], color=color)))
+        # Struktur sudah divalidasi saat template dibuat; go.Figure tetap
+        # menyalin dict ini sehingga template tidak ikut berubah
+        return go.Figure({"data": [trace], "layout": self._layout}, _validate=False)
+
+
+def _render(fig):
+    """Serialisasi seperti st.plotly_chart: validasi figure lalu JSON"""
+    import plotly.io as pio
+    import plotly.tools
+
+    return pio.to_json(plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+
+
+def measure_gauge(n=500, seed=0):
+    """
+    Waktu membuat dan menserialisasi gauge (ms per figure) dan ukuran JSON-nya,
+    dengan cara lama (figure baru tiap nilai) dan dengan GaugeTemplate
+    (nilai belum di-cache dan sudah di-cache).
+    """
+    values = np.random.default_rng(seed).random(n) * GAUGE_MAX
+
+    def timed(func):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        return (time.perf_counter() - start) / n * 1000
+
+    start = time.perf_counter()
+    template = GaugeTemplate(cache_size=n)
+    template_ms = (time.perf_counter() - start) * 1000
+    report = {
+        "before": {
+            "build_ms": timed(build_gauge_figure),
+            "build_render_ms": timed(lambda v: _render(build_gauge_figure(v))),
+            "json_bytes": len(_render(build_gauge_figure(values[0]))),
+        },
+        "after": {
+            "template_once_ms": template_ms,
+            "build_miss_ms": timed(template.figure),
+            "build_hit_ms": timed(template.figure),
+            "build_render_hit_ms": timed(lambda v: _render(template.figure(v))),
+            "json_bytes": len(_render(template.figure(values[0]))),
+        },
+    }
+    # Figure dari template harus sama dengan figure yang dibangun penuh
+    # (urutan kunci JSON boleh berbeda)
+    value = round(float(values[0]), 1)
+    report["identical_figure"] = json.loads(_render(template.figure(value))) == json.loads(
+        _render(build_gauge_figure(value))
+    )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukur waktu dan ukuran figure gauge AQI")
+    parser.add_argument("--samples", type=int, default=500, help="Jumlah nilai AQI acak")
+    args = parser.parse_args(argv)
+    print(json.dumps(measure_gauge(args.samples), indent=2))
+
+
+if __name__ == "__main__":
+    main()
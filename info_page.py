@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 
 
 def show_info_page():
@@ -69,6 +68,9 @@ def show_info_page():
         ],
     }
 
+    # pandas hanya dimuat saat tabel ini dibuat, bukan saat aplikasi dimulai
+    import pandas as pd
+
     df = pd.DataFrame(data)
 
     # Styling yang lebih modern
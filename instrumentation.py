@@ -0,0 +1,225 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+
+# Batas bucket histogram (detik), dari 10 µs sampai 10 detik
+DEFAULT_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# Rincian tahap untuk request yang sedang berjalan (per thread/task)
+_current_request = contextvars.ContextVar("aqi_current_request", default=None)
+
+
+class _NullStage:
+    """Context manager kosong yang dipakai saat instrumentasi mati"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Request:
+    __slots__ = ("instrumentation", "name", "start", "stages", "token")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.stages = {}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.token = _current_request.set(self.stages)
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _current_request.reset(self.token)
+        self.instrumentation.record(self.name, elapsed)
+        self.instrumentation._finish_request(self.name, elapsed, self.stages)
+        return False
+
+
+class Instrumentation:
+    """
+    Pencatat waktu per tahap (fuzzifikasi, penyalaan rule, defuzzifikasi,
+    gauge, render, ...). Tiap tahap dicatat sebagai histogram; tahap yang
+    terjadi di dalam ``request()`` juga dicatat per request dan request
+    terakhir disimpan di ``history``.
+
+    Saat ``enabled`` False, ``stage()`` dan ``request()`` mengembalikan
+    context manager kosong yang sama, jadi biayanya hanya satu pengecekan
+    atribut.
+    """
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS, history=100):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._caches = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # tahap -> [jumlah per bucket..., jumlah, total detik, maksimum]
+            self._stages = {}
+            self._counters = {}
+            self.history.clear()
+
+    def stage(self, name):
+        """Context manager yang mencatat durasi blok sebagai tahap ``name``"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def request(self, name="request"):
+        """Context manager satu request; tahap di dalamnya dirinci per request"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Request(self, name)
+
+    def record(self, name, seconds):
+        """Catat satu durasi untuk tahap ``name``"""
+        if not self.enabled:
+            return
+        stages = _current_request.get()
+        if stages is not None:
+            count, total = stages.get(name, (0, 0.0))
+            stages[name] = (count + 1, total + seconds)
+        with self._lock:
+            data = self._stages.get(name)
+            if data is None:
+                data = self._stages[name] = [0] * len(self.buckets) + [0, 0.0, 0.0]
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                data[index] += 1
+            n = len(self.buckets)
+            data[n] += 1
+            data[n + 1] += seconds
+            data[n + 2] = max(data[n + 2], seconds)
+
+    def count(self, name, value=1):
+        """Tambah penghitung ``name`` (misalnya jumlah baris yang dihitung)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register_cache(self, name, cache):
+        """
+        Ekspor statistik ``cache.stats()`` (misalnya ResultCache) sebagai
+        ``name``. Statistik cache selalu dihitung oleh cache itu sendiri,
+        jadi tetap tersedia walaupun instrumentasi tidak aktif.
+        """
+        with self._lock:
+            self._caches[name] = cache
+        return cache
+
+    def cache_stats(self):
+        """Statistik semua cache yang terdaftar, {nama: stats}"""
+        with self._lock:
+            caches = dict(self._caches)
+        return {name: cache.stats() for name, cache in caches.items()}
+
+    def _finish_request(self, name, elapsed, stages):
+        self.history.append(
+            {
+                "name": name,
+                "time": time.time(),
+                "seconds": elapsed,
+                "stages": {stage: {"count": c, "seconds": s} for stage, (c, s) in stages.items()},
+            }
+        )
+
+    def snapshot(self):
+        """Statistik semua tahap dan penghitung sebagai dict (untuk JSON)"""
+        n = len(self.buckets)
+        with self._lock:
+            stages = {
+                name: {
+                    "count": data[n],
+                    "seconds_total": data[n + 1],
+                    "seconds_mean": data[n + 1] / data[n] if data[n] else 0.0,
+                    "seconds_max": data[n + 2],
+                }
+                for name, data in self._stages.items()
+            }
+            counters = dict(self._counters)
+        return {
+            "enabled": self.enabled,
+            "stages": stages,
+            "counters": counters,
+            "caches": self.cache_stats(),
+            "last_request": self.last_request(),
+        }
+
+    def last_request(self):
+        return self.history[-1] if self.history else None
+
+    def prometheus(self, prefix="aqi"):
+        """Statistik dalam format teks Prometheus (histogram per tahap dan counter)"""
+        n = len(self.buckets)
+        lines = [
+            f"# HELP {prefix}_stage_seconds Durasi tiap tahap inferensi AQI",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            stages = {name: list(data) for name, data in self._stages.items()}
+            counters = dict(self._counters)
+        for name, data in sorted(stages.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, data[:n]):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {data[n]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {data[n + 1]:.9g}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {data[n]}')
+        if counters:
+            lines.append(f"# HELP {prefix}_events_total Penghitung kejadian (misalnya jumlah baris yang dihitung)")
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(counters.items()):
+                lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        caches = self.cache_stats()
+        if caches:
+            for metric, kind, help_text in (
+                ("hits", "counter", "Jumlah cache hit"),
+                ("misses", "counter", "Jumlah cache miss"),
+                ("evictions", "counter", "Entri yang dibuang karena cache penuh"),
+                ("expirations", "counter", "Entri yang dibuang karena TTL habis"),
+                ("size", "gauge", "Jumlah entri cache saat ini"),
+                ("maxsize", "gauge", "Batas jumlah entri cache"),
+            ):
+                full = f"{prefix}_cache_{metric}" + ("_total" if kind == "counter" else "")
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                for name, stats in sorted(caches.items()):
+                    if metric in stats:
+                        lines.append(f'{full}{{cache="{name}"}} {stats[metric]}')
+        return "\n".join(lines) + "\n"
+
+
+# Instans bersama; aktifkan dengan AQI_INSTRUMENTATION=1 atau INSTRUMENTATION.enabled = True
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get("AQI_INSTRUMENTATION", "") == "1")
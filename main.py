@@ -1,134 +1,182 @@
+import os
+
 import streamlit as st
-import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-from rules import create_rules
+from aqi_categories import AQI_CATEGORIES, category_color
+from result_cache import ResultCache
 from info_page import show_info_page
-import plotly.graph_objects as go
+from dashboard_page import show_dashboard_page
+from instrumentation import INSTRUMENTATION
+
+# Sistem fuzzy (numpy) dan Plotly baru diimpor saat halaman kalkulator
+# dibuka, pandas saat halaman informasi/dashboard dibuat; lihat benchmark.bench_imports
 
 # Set page config at the very beginning
 st.set_page_config(page_title="Sistem AQI", page_icon="🌬️", layout="wide")
 
+# Ukuran dan umur (detik, 0 = tanpa batas) cache hasil perhitungan dan
+# sapuan what-if. Semua cache terbatas dan statistiknya terlihat di
+# INSTRUMENTATION.cache_stats() / panel debug.
+RESULT_CACHE_SIZE = int(os.environ.get("AQI_RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_TTL = float(os.environ.get("AQI_RESULT_CACHE_TTL", "0")) or None
+SWEEP_CACHE_SIZE = int(os.environ.get("AQI_SWEEP_CACHE_SIZE", "32"))
+SWEEP_CACHE_TTL = float(os.environ.get("AQI_SWEEP_CACHE_TTL", "600")) or None
+
 
 @st.cache_resource
 def initialize_fuzzy_system():
     """
-    Initialize fuzzy system dengan cache untuk menghindari inisialisasi berulang
+    Initialize fuzzy system dengan cache untuk menghindari inisialisasi berulang.
+    Layanan ini immutable sehingga aman dibagi ke semua sesi. Array sistem
+    dimuat dari artefak (memory-map) agar proses baru siap dalam milidetik.
     """
-    # 1. Definisi variabel input dan output
-    pm25 = ctrl.Antecedent(np.arange(0, 446, 1), "PM2.5")
-    pm10 = ctrl.Antecedent(np.arange(0, 551, 1), "PM10")
-    co = ctrl.Antecedent(np.arange(0, 54166, 1), "CO")
-    no2 = ctrl.Antecedent(np.arange(0, 551, 1), "NO2")
-    o3 = ctrl.Antecedent(np.arange(0, 1502, 1), "O3")
-    so2 = ctrl.Antecedent(np.arange(0, 3001, 1), "SO2")
-    aqi = ctrl.Consequent(np.arange(0, 551, 1), "AQI")
-
-    # 2. Definisi fungsi keanggotaan (membership functions)
-    pm25["baik"] = fuzz.trapmf(pm25.universe, [0, 0, 15, 45])
-    pm25["sedang"] = fuzz.trimf(pm25.universe, [15, 45, 75])
-    pm25["buruk"] = fuzz.trimf(pm25.universe, [45, 75, 105])
-    pm25["tidak_sehat"] = fuzz.trimf(pm25.universe, [75, 105, 135])
-    pm25["parah"] = fuzz.trimf(pm25.universe, [105, 185, 265])
-    pm25["berbahaya"] = fuzz.trapmf(pm25.universe, [185, 315, 445, 445])
-
-    # PM10
-    pm10["baik"] = fuzz.trapmf(pm10.universe, [0, 0, 25, 75])
-    pm10["sedang"] = fuzz.trimf(pm10.universe, [25, 75, 125])
-    pm10["buruk"] = fuzz.trimf(pm10.universe, [75, 175, 275])
-    pm10["tidak_sehat"] = fuzz.trimf(pm10.universe, [210, 300, 390])
-    pm10["parah"] = fuzz.trimf(pm10.universe, [310, 390, 470])
-    pm10["berbahaya"] = fuzz.trapmf(pm10.universe, [390, 470, 550, 550])
-
-    # CO
-    co["baik"] = fuzz.trapmf(co.universe, [0, 0, 4165, 12500])
-    co["sedang"] = fuzz.trimf(co.universe, [4165, 12500, 20835])
-    co["buruk"] = fuzz.trimf(co.universe, [12505, 20835, 29165])
-    co["tidak_sehat"] = fuzz.trimf(co.universe, [20835, 29165, 37495])
-    co["parah"] = fuzz.trimf(co.universe, [29165, 37500, 45835])
-    co["berbahaya"] = fuzz.trapmf(co.universe, [37505, 45835, 54165, 54165])
-
-    # NO2
-    no2["baik"] = fuzz.trapmf(no2.universe, [0, 0, 20, 60])
-    no2["sedang"] = fuzz.trimf(no2.universe, [20, 60, 100])
-    no2["buruk"] = fuzz.trimf(no2.universe, [75, 130, 185])
-    no2["tidak_sehat"] = fuzz.trimf(no2.universe, [130, 185, 240])
-    no2["parah"] = fuzz.trimf(no2.universe, [185, 295, 405])
-    no2["berbahaya"] = fuzz.trapmf(no2.universe, [350, 450, 550, 550])
-
-    # O3
-    o3["baik"] = fuzz.trapmf(o3.universe, [0, 0, 25, 75])
-    o3["sedang"] = fuzz.trimf(o3.universe, [25, 75, 100])
-    o3["buruk"] = fuzz.trimf(o3.universe, [80, 134, 188])
-    o3["tidak_sehat"] = fuzz.trimf(o3.universe, [148, 188, 228])
-    o3["parah"] = fuzz.trimf(o3.universe, [188, 470, 752])
-    o3["berbahaya"] = fuzz.trapmf(o3.universe, [497, 999, 1501, 1501])
-
-    # SO2
-    so2["baik"] = fuzz.trapmf(so2.universe, [0, 0, 20, 60])
-    so2["sedang"] = fuzz.trimf(so2.universe, [20, 60, 100])
-    so2["buruk"] = fuzz.trimf(so2.universe, [60, 230, 400])
-    so2["tidak_sehat"] = fuzz.trimf(so2.universe, [230, 590, 950])
-    so2["parah"] = fuzz.trimf(so2.universe, [590, 1200, 1810])
-    so2["berbahaya"] = fuzz.trapmf(so2.universe, [1200, 2100, 3000, 3000])
-
-    # AQI Output
-    aqi["baik"] = fuzz.trapmf(aqi.universe, [0, 0, 25, 75])
-    aqi["sedang"] = fuzz.trimf(aqi.universe, [25, 75, 125])
-    aqi["buruk"] = fuzz.trimf(aqi.universe, [75, 125, 175])
-    aqi["tidak_sehat"] = fuzz.trimf(aqi.universe, [125, 175, 225])
-    aqi["parah"] = fuzz.trimf(aqi.universe, [175, 225, 275])
-    aqi["berbahaya"] = fuzz.trapmf(aqi.universe, [225, 275, 325, 325])
-
-    # 3. Create rules and control system
-    rules = create_rules(pm25, pm10, co, no2, o3, so2, aqi)
-    aqi_ctrl = ctrl.ControlSystem(rules)
-    return ctrl.ControlSystemSimulation(aqi_ctrl)
-
-
-@st.cache_data
+    from aqi_service import create_aqi_service
+    from system_artifact import DEFAULT_ARTIFACT
+    from variables import INPUT_BREAKPOINTS
+
+    return create_aqi_service(artifact_path=DEFAULT_ARTIFACT, resolution=INPUT_BREAKPOINTS)
+
+
+@st.cache_resource
+def get_result_cache():
+    """Cache nilai AQI per tuple input, dibagi ke semua sesi"""
+    return INSTRUMENTATION.register_cache("result", ResultCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL))
+
+
+@st.cache_resource
+def get_sweep_cache():
+    """Cache hasil sapuan what-if per (input, rentang, jumlah titik)"""
+    return INSTRUMENTATION.register_cache("sweep", ResultCache(maxsize=SWEEP_CACHE_SIZE, ttl=SWEEP_CACHE_TTL))
+
+
 def get_category_color(aqi_value):
-    """Cache function untuk mendapatkan warna dan kategori"""
-    if aqi_value < 50:
-        return "#9EFF9E", "Baik"
-    elif aqi_value < 100:
-        return "#FFFF9E", "Sedang"
-    elif aqi_value < 150:
-        return "#FFB84D", "Buruk"
-    elif aqi_value < 200:
-        return "#FF9E9E", "Tidak Sehat"
-    elif aqi_value < 250:
-        return "#FF69B4", "Parah"
+    """
+    Warna dan kategori untuk nilai AQI. Tidak di-cache: satu bisect pada enam
+    batas kategori lebih murah daripada hashing argumen st.cache_data, dan
+    tidak menambah entri baru untuk setiap nilai float.
+    """
+    return category_color(aqi_value)
+
+
+@st.cache_resource
+def get_gauge_template(title):
+    """Template gauge (struktur dibangun sekali, cache figure terbatas), dibagi ke semua sesi"""
+    from gauge import GaugeTemplate
+
+    template = GaugeTemplate(title)
+    INSTRUMENTATION.register_cache("gauge", template.cache)
+    return template
+
+
+def create_gauge_chart(value, title, color):
+    """Gauge chart dari template; hanya nilai dan warna bar (warna kategori) yang diganti"""
+    with INSTRUMENTATION.stage("gauge"):
+        return get_gauge_template(title).figure(value, color)
+
+
+def compute_sweep(inputs, ranges, points):
+    """
+    AQI untuk sapuan satu/dua parameter (lihat sweep.sweep). ``ranges`` berupa
+    tuple (label, bawah, atas); hasilnya (titik per sumbu, array AQI).
+    """
+    from sweep import sweep, sweep_axis
+
+    def compute():
+        engine = initialize_fuzzy_system().engine
+        axes = {label: sweep_axis(engine, label, points, lower, upper) for label, lower, upper in ranges}
+        with INSTRUMENTATION.stage("sweep"):
+            return list(axes.values()), sweep(engine, inputs, axes)
+
+    return get_sweep_cache().get_or_compute((inputs, ranges, points), compute)
+
+
+def show_sweep_section(aqi_system, inputs):
+    """Grafik AQI saat satu atau dua parameter diubah dan sisanya tetap"""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    st.markdown('<h4 style="margin-top: 20px;">Analisis What-If</h4>', unsafe_allow_html=True)
+    engine = aqi_system.engine
+    labels = list(engine.labels)
+    current = dict(zip(labels, inputs))
+
+    mode = st.radio("Jenis sapuan", ["1 parameter", "2 parameter"], horizontal=True)
+    swept = [st.selectbox("Parameter yang diubah", labels)]
+    if mode == "2 parameter":
+        swept.append(st.selectbox("Parameter kedua", [label for label in labels if label != swept[0]]))
+
+    ranges = []
+    for label in swept:
+        universe = engine.universes[labels.index(label)]
+        lower, upper = st.slider(
+            f"Rentang {label}",
+            min_value=float(universe[0]),
+            max_value=float(universe[-1]),
+            value=(float(universe[0]), float(universe[-1])),
+        )
+        ranges.append((label, lower, upper))
+    points = st.slider("Jumlah titik per parameter", min_value=20, max_value=400, value=200, step=10)
+
+    axes, values = compute_sweep(tuple(inputs), tuple(ranges), points)
+
+    if len(axes) == 1:
+        top = max(300.0, float(np.nanmax(values))) if np.isfinite(values).any() else 300.0
+        fig = go.Figure(go.Scatter(x=axes[0], y=values, mode="lines", line={"color": "#1E88E5"}))
+        lower = 0
+        for upper, color, _ in AQI_CATEGORIES:
+            fig.add_hrect(y0=lower, y1=min(upper, top), fillcolor=color, opacity=0.3, line_width=0, layer="below")
+            lower = upper
+        fig.add_vline(x=current[swept[0]], line_dash="dash", line_color="gray")
+        fig.update_layout(xaxis_title=swept[0], yaxis_title="AQI", yaxis_range=[0, top])
     else:
-        return "#FF4D4D", "Berbahaya"
-
-
-@st.cache_data
-def create_gauge_chart(value, title):
-    """Cache function untuk membuat gauge chart"""
-    color, _ = get_category_color(value)
-    fig = go.Figure(
-        go.Indicator(
-            mode="gauge+number",
-            value=value,
-            domain={"x": [0, 1], "y": [0, 1]},
-            title={"text": title},
-            gauge={
-                "axis": {"range": [0, 300]},
-                "bar": {"color": color},
-                "steps": [
-                    {"range": [0, 50], "color": "#9EFF9E"},
-                    {"range": [50, 100], "color": "#FFFF9E"},
-                    {"range": [100, 150], "color": "#FFB84D"},
-                    {"range": [150, 200], "color": "#FF9E9E"},
-                    {"range": [200, 250], "color": "#FF69B4"},
-                    {"range": [250, 300], "color": "#FF4D4D"},
-                ],
-            },
+        # Skala warna bertingkat sesuai kategori AQI pada rentang 0-300
+        colorscale = []
+        lower = 0
+        for upper, color, _ in AQI_CATEGORIES:
+            upper = min(upper, 300)
+            colorscale += [[lower / 300, color], [upper / 300, color]]
+            lower = upper
+        fig = go.Figure(
+            go.Heatmap(
+                x=axes[0],
+                y=axes[1],
+                z=values.T,
+                zmin=0,
+                zmax=300,
+                colorscale=colorscale,
+                colorbar={"title": "AQI"},
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=[current[swept[0]]],
+                y=[current[swept[1]]],
+                mode="markers",
+                marker={"symbol": "x", "size": 12, "color": "black"},
+                showlegend=False,
+            )
         )
+        fig.update_layout(xaxis_title=swept[0], yaxis_title=swept[1])
+    fig.update_layout(height=400, margin={"t": 30})
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{values.size:,} titik dihitung sekaligus. Bagian kosong berarti tidak ada rule yang aktif; "
+        "garis/tanda silang menunjukkan nilai input saat ini."
     )
-    fig.update_layout(height=300)
-    return fig
+
+
+def show_debug_panel():
+    """Rincian waktu per tahap request terakhir dan statistik keseluruhan"""
+    with st.expander("Debug: waktu per tahap", expanded=True):
+        last = INSTRUMENTATION.last_request()
+        if last is not None:
+            st.write(f"Request terakhir: {last['seconds'] * 1000:.2f} ms")
+            st.table(
+                [
+                    {"Tahap": name, "Jumlah": stage["count"], "Waktu (ms)": round(stage["seconds"] * 1000, 3)}
+                    for name, stage in last["stages"].items()
+                ]
+            )
+        st.json({"tahap": INSTRUMENTATION.snapshot()["stages"], "cache": INSTRUMENTATION.cache_stats()})
 
 
 def show_calculator_page():
@@ -223,43 +271,36 @@ def show_calculator_page():
     with col2:
         calculate_button = st.button("Hitung AQI", use_container_width=True)
 
+    inputs = (pm25_input, pm10_input, co_input, no2_input, o3_input, so2_input)
+    inputs_complete = all(v is not None for v in inputs)
+
     if calculate_button:
-        if all(
-            v is not None
-            for v in [pm25_input, pm10_input, co_input, no2_input, o3_input, so2_input]
-        ):
+        if inputs_complete:
             try:
-                # Input values to fuzzy system
-                aqi_system.input["PM2.5"] = pm25_input
-                aqi_system.input["PM10"] = pm10_input
-                aqi_system.input["CO"] = co_input
-                aqi_system.input["NO2"] = no2_input
-                aqi_system.input["O3"] = o3_input
-                aqi_system.input["SO2"] = so2_input
-
-                # Calculate AQI
-                aqi_system.compute()
-                aqi_value = float(aqi_system.output["AQI"])
-
-                # Get category and color
-                color, category = get_category_color(aqi_value)
-
-                # Display gauge chart
-                st.plotly_chart(
-                    create_gauge_chart(aqi_value, "Indeks Kualitas Udara (AQI)"),
-                    use_container_width=True,
-                )
-
-                # Display results with styling
-                st.markdown(
-                    f"""
-                    <div style='text-align: center; padding: 10px 10px; background-color: {color}; border-radius: 10px;'>
-                        <h4 style='margin: 0;'>Kategori: {category}</h4>
-                        <h4 style='margin: 10px 0;'>AQI: {aqi_value:.1f}</h4>
-                    </div>
-                """,
-                    unsafe_allow_html=True,
-                )
+
+                with INSTRUMENTATION.request("calculator"):
+                    # Calculate AQI, reusing cached results for repeated readings
+                    aqi_value = get_result_cache().get_or_compute(inputs, lambda: aqi_system.evaluate(inputs))
+
+                    # Get category and color
+                    color, category = get_category_color(aqi_value)
+                    # Warna bar gauge sama dengan kartu kategori di bawahnya
+                    gauge_chart = create_gauge_chart(aqi_value, "Indeks Kualitas Udara (AQI)", color)
+
+                    with INSTRUMENTATION.stage("render"):
+                        # Display gauge chart
+                        st.plotly_chart(gauge_chart, use_container_width=True)
+
+                        # Display results with styling
+                        st.markdown(
+                            f"""
+                            <div style='text-align: center; padding: 10px 10px; background-color: {color}; border-radius: 10px;'>
+                                <h4 style='margin: 0;'>Kategori: {category}</h4>
+                                <h4 style='margin: 10px 0;'>AQI: {aqi_value:.1f}</h4>
+                            </div>
+                        """,
+                            unsafe_allow_html=True,
+                        )
 
                 # Show recommendations based on category
                 st.markdown('<h4 style="margin-top: 20px;">Rekomendasi</h4>', unsafe_allow_html=True)
@@ -293,6 +334,18 @@ def show_calculator_page():
         else:
             st.error("Mohon isi semua nilai parameter untuk menghitung AQI.")
 
+    # Tombol hanya aktif satu rerun, jadi sapuan diatur lewat checkbox sendiri
+    if inputs_complete and st.checkbox("Tampilkan analisis what-if (sapuan parameter)"):
+        try:
+            show_sweep_section(aqi_system, inputs)
+        except Exception as e:
+            st.error(f"Terjadi kesalahan dalam analisis: {str(e)}")
+
+    # Dirender di setiap rerun; di dalam blok tombol checkbox ini hilang
+    # (beserta statusnya) pada rerun yang dipicu saat mengkliknya
+    if INSTRUMENTATION.enabled and st.sidebar.checkbox("Tampilkan panel debug"):
+        show_debug_panel()
+
 
 def main():
     # Add custom CSS
@@ -319,10 +372,12 @@ def main():
     )
 
     # Sidebar navigation
-    page = st.sidebar.selectbox("Pilih Halaman", ["Informasi AQI", "Kalkulator AQI"])
+    page = st.sidebar.selectbox("Pilih Halaman", ["Informasi AQI", "Kalkulator AQI", "Dashboard Stasiun"])
 
     if page == "Kalkulator AQI":
         show_calculator_page()
+    elif page == "Dashboard Stasiun":
+        show_dashboard_page(initialize_fuzzy_system())
     else:
         show_info_page()
     
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def _is_integer_grid(universe):
+    """True bila universe berupa np.arange bilangan bulat dengan langkah 1"""
+    return (
+        universe.size > 1
+        and np.all(universe == np.round(universe))
+        and np.all(np.diff(universe) == 1)
+    )
+
+
+class MembershipTables:
+    """
+    Tabel keanggotaan padat (len(universe), n_term) float32 per variabel.
+
+    Input bilangan bulat cukup dibaca dengan satu indeks; input pecahan atau
+    variabel dengan universe non-integer memakai interpolasi seperti biasa.
+    """
+
+    def __init__(self, labels, universes, term_mfs, max_terms):
+        self.labels = tuple(labels)
+        self.universes = universes
+        self.term_mfs = term_mfs
+        self.max_terms = max_terms
+        self.tables = []
+        for universe, mfs in zip(universes, term_mfs):
+            if _is_integer_grid(universe):
+                table = np.zeros((universe.size, max_terms), dtype=np.float32)
+                table[:, : len(mfs)] = mfs.T
+                self.tables.append(table)
+            else:
+                self.tables.append(None)
+
+    def lookup(self, inputs):
+        """Derajat keanggotaan (n, n_variabel, max_term) untuk input (n, n_variabel)"""
+        memberships = np.zeros((inputs.shape[0], len(self.universes), self.max_terms))
+        for i, (universe, mfs, table) in enumerate(zip(self.universes, self.term_mfs, self.tables)):
+            x = np.clip(inputs[:, i], universe[0], universe[-1])
+            if table is None:
+                exact = np.zeros(x.shape, dtype=bool)
+            else:
+                exact = x == np.floor(x)
+                memberships[exact, i] = table[(x[exact] - universe[0]).astype(np.intp)]
+            if not exact.all():
+                rest = ~exact
+                for j, mf in enumerate(mfs):
+                    memberships[rest, i, j] = np.interp(x[rest], universe, mf, left=0.0, right=0.0)
+        return memberships
+
+    def memory_usage(self):
+        """Ukuran tabel per variabel dalam byte (0 bila tidak memakai tabel)"""
+        return {
+            label: 0 if table is None else table.nbytes
+            for label, table in zip(self.labels, self.tables)
+        }
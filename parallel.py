@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_engine import create_batch_engine
+from variables import INPUT_LABELS
+
+# Mesin dan buffer shared memory milik proses worker
+_engine = None
+_buffers = {}
+
+
+def _init_worker(engine_options):
+    """Bangun sistem fuzzy sekali per proses worker"""
+    global _engine
+    _engine = create_batch_engine(**engine_options)
+
+
+def _attach(name):
+    """Buka shared memory milik proses utama (sekali per nama per worker)"""
+    shm = _buffers.get(name)
+    if shm is None:
+        # Buffer lama (sebelum diperbesar) tidak dipakai lagi
+        while len(_buffers) >= 2:
+            _buffers.pop(next(iter(_buffers))).close()
+        # Resource tracker dipakai bersama proses utama, yang juga bertugas
+        # menghapus (unlink) buffer ini
+        shm = shared_memory.SharedMemory(name=name)
+        _buffers[name] = shm
+    return shm
+
+
+def _score_range(input_name, output_name, n_rows, n_cols, start, stop):
+    """Hitung AQI baris [start, stop) langsung dari/ke shared memory"""
+    inputs = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=_attach(input_name).buf)
+    output = np.ndarray((n_rows,), dtype=np.float64, buffer=_attach(output_name).buf)
+    output[start:stop] = _engine.compute(inputs[start:stop])
+    return stop - start
+
+
+class ParallelScorer:
+    """
+    Menghitung AQI dengan beberapa proses sekaligus.
+
+    Input disalin sekali ke shared memory dan hasil ditulis langsung ke buffer
+    output bersama, jadi yang dikirim lewat IPC hanya indeks awal/akhir tiap
+    potongan. Urutan baris hasil selalu sama dengan input. Dipakai seperti
+    BatchAQIEngine: ``scorer.compute(array)``.
+    """
+
+    def __init__(self, workers=None, task_rows=None, **engine_options):
+        self.workers = workers or os.cpu_count() or 1
+        self.task_rows = task_rows
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(engine_options,)
+        )
+        self._input = None
+        self._output = None
+        self._capacity = 0
+        self._n_cols = 0
+
+    def _task_rows(self, n_rows):
+        """
+        Ukuran potongan per task: sekitar empat task per worker agar beban
+        merata, tetapi minimal 8192 baris agar overhead penjadwalan kecil.
+        """
+        if self.task_rows:
+            return self.task_rows
+        return max(8192, -(-n_rows // (self.workers * 4)))
+
+    def _ensure_buffers(self, n_rows, n_cols):
+        if n_cols == self._n_cols and n_rows <= self._capacity:
+            return
+        self._release_buffers()
+        self._input = shared_memory.SharedMemory(create=True, size=max(n_rows * n_cols, 1) * 8)
+        self._output = shared_memory.SharedMemory(create=True, size=max(n_rows, 1) * 8)
+        self._capacity, self._n_cols = n_rows, n_cols
+
+    def compute(self, data):
+        """
+        Hitung AQI untuk array (n, 6) dengan urutan kolom INPUT_LABELS atau
+        DataFrame yang memiliki kolom-kolom tersebut, hasil berurutan seperti input
+        """
+        if hasattr(data, "columns"):
+            data = data[list(INPUT_LABELS)].to_numpy(dtype=np.float64)
+        inputs = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        n_rows, n_cols = inputs.shape
+        if n_cols != len(INPUT_LABELS):
+            raise ValueError(f"Input harus memiliki {len(INPUT_LABELS)} kolom: {', '.join(INPUT_LABELS)}")
+        if n_rows == 0:
+            return np.empty(0)
+        self._ensure_buffers(n_rows, n_cols)
+
+        shared_inputs = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=self._input.buf)
+        shared_inputs[:] = inputs
+        step = self._task_rows(n_rows)
+        futures = [
+            self._executor.submit(
+                _score_range, self._input.name, self._output.name, n_rows, n_cols, start, min(start + step, n_rows)
+            )
+            for start in range(0, n_rows, step)
+        ]
+        for future in futures:
+            future.result()
+        return np.ndarray((n_rows,), dtype=np.float64, buffer=self._output.buf).copy()
+
+    def _release_buffers(self):
+        for shm in (self._input, self._output):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._input = self._output = None
+        self._capacity = 0
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._release_buffers()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
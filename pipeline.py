@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import json
+import math
+import signal
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from aqi_categories import categorize_array
+
+# Penanda akhir aliran di antrean input/output
+_CLOSE = object()
+
+
+class AQIPipeline:
+    """
+    Tahap asyncio untuk menilai pembacaan dari banyak stasiun.
+
+    Produsen memanggil ``await pipeline.put(station, reading)``; antrean
+    input dibatasi ``max_queue`` sehingga produsen menunggu bila penilaian
+    tertinggal (backpressure). Pembacaan dikumpulkan menjadi micro-batch
+    sampai ``batch_size`` baris atau ``max_delay`` detik sejak baris pertama,
+    lalu dihitung sekaligus oleh ``engine.compute`` di thread terpisah agar
+    event loop tetap responsif. Hasil diambil konsumen lewat
+    ``async for result in pipeline.results()``; antrean hasil juga dibatasi,
+    jadi konsumen yang lambat ikut menahan produsen.
+    """
+
+    def __init__(self, engine, batch_size=512, max_delay=0.05, max_queue=10_000, max_pending_batches=64):
+        self.engine = engine
+        self.labels = engine.labels
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = asyncio.Queue(max_queue)
+        self._results = asyncio.Queue(max_pending_batches)
+        self._task = None
+        self._error = None
+        self._latencies = deque(maxlen=10_000)
+        self._started = None
+        self._counters = {"submitted": 0, "scored": 0, "rejected": 0, "batches": 0, "producer_waits": 0}
+        self._compute_seconds = 0.0
+
+    def start(self):
+        """Jalankan task micro-batching di event loop yang sedang berjalan"""
+        if self._task is None:
+            self._started = time.perf_counter()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def put(self, station, reading):
+        """
+        Masukkan satu pembacaan {label: nilai}; menunggu bila antrean penuh.
+        Melempar RuntimeError bila penilaian sudah berhenti karena error.
+        """
+        self._check_error()
+        item = (station, reading, time.perf_counter())
+        if self._queue.full():
+            self._counters["producer_waits"] += 1
+        await self._queue.put(item)
+        self._check_error()
+        self._counters["submitted"] += 1
+
+    def _check_error(self):
+        if self._error is not None:
+            raise RuntimeError("Penilaian AQI berhenti karena error") from self._error
+
+    async def close(self):
+        """
+        Tandai akhir input; pembacaan yang sudah masuk tetap dinilai. Error
+        dari penilaian (engine.compute dan seterusnya) dilempar ulang di sini.
+        """
+        if self._error is None:
+            await self._queue.put(_CLOSE)
+        if self._task is not None:
+            await self._task
+
+    async def _next_batch(self):
+        """Kumpulkan satu micro-batch; mengembalikan (batch, selesai)"""
+        item = await self._queue.get()
+        if item is _CLOSE:
+            return [], True
+        batch = [item]
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is _CLOSE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _rows(self, batch):
+        """Ubah pembacaan menjadi array input; pembacaan tidak valid menjadi NaN"""
+        rows = np.full((len(batch), len(self.labels)), np.nan)
+        errors = [None] * len(batch)
+        for i, (_, reading, _) in enumerate(batch):
+            try:
+                rows[i] = [float(reading[label]) for label in self.labels]
+            except (KeyError, TypeError, ValueError):
+                errors[i] = f"Pembacaan tidak lengkap atau tidak valid: {reading}"
+        return rows, errors
+
+    def _score(self, rows):
+        start = time.perf_counter()
+        valid = ~np.isnan(rows).any(axis=1)
+        values = np.full(rows.shape[0], np.nan)
+        if valid.any():
+            values[valid] = self.engine.compute(rows[valid])
+        return values, time.perf_counter() - start
+
+    async def _run(self):
+        try:
+            await self._process()
+        except BaseException as e:
+            self._error = e
+            # Bangunkan produsen yang menunggu antrean penuh; put() berikutnya
+            # melempar error
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            raise
+        finally:
+            # Konsumen results()/batches() selalu berhenti, juga saat error
+            await self._results.put(_CLOSE)
+
+    async def _process(self):
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            batch, done = await self._next_batch()
+            if not batch:
+                continue
+            rows, errors = self._rows(batch)
+            values, elapsed = await loop.run_in_executor(None, self._score, rows)
+            _, categories = categorize_array(values)
+
+            now = time.perf_counter()
+            results = []
+            for (station, reading, enqueued), value, category, error in zip(batch, values, categories, errors):
+                self._latencies.append(now - enqueued)
+                result = {"station": station, **reading, "AQI": None if math.isnan(value) else float(value)}
+                result["Kategori"] = category
+                if error is not None:
+                    result["error"] = error
+                    self._counters["rejected"] += 1
+                results.append(result)
+            self._counters["scored"] += len(batch)
+            self._counters["batches"] += 1
+            self._compute_seconds += elapsed
+            await self._results.put(results)
+
+    async def batches(self):
+        """Async generator daftar hasil per micro-batch, berhenti setelah close()"""
+        while True:
+            results = await self._results.get()
+            if results is _CLOSE:
+                return
+            yield results
+
+    async def results(self):
+        """Async generator hasil per pembacaan, berhenti setelah close()"""
+        async for results in self.batches():
+            for result in results:
+                yield result
+
+    def metrics(self):
+        """Ringkasan throughput, ukuran batch, kedalaman antrean, dan latensi (detik)"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        counters = self._counters
+        metrics = dict(counters)
+        metrics.update(
+            {
+                "queue_depth": self._queue.qsize(),
+                "pending_result_batches": self._results.qsize(),
+                "mean_batch_size": counters["scored"] / counters["batches"] if counters["batches"] else 0.0,
+                "rows_per_second": counters["scored"] / elapsed if elapsed > 0 else 0.0,
+                "compute_seconds": self._compute_seconds,
+            }
+        )
+        if self._latencies:
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+            for q in (50, 90, 99):
+                metrics[f"latency_p{q}"] = float(np.percentile(latencies, q))
+        return metrics
+
+
+def _parse_line(line, labels):
+    """
+    Satu baris JSON {"station": ..., label: nilai, ...} atau CSV
+    station,nilai1,...,nilai6. Melempar ValueError untuk baris yang rusak.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        reading = json.loads(line)
+        return reading.pop("station", None), reading
+    station, *values = line.split(",")
+    return station, dict(zip(labels, map(float, values)))
+
+
+async def file_producer(pipeline, path, rate=None):
+    """
+    Kirim pembacaan dari file JSON lines atau CSV (tanpa header) ke pipeline.
+    ``rate`` membatasi jumlah pembacaan per detik untuk meniru sensor.
+    """
+    sent = 0
+    start = time.perf_counter()
+    with open(path) as f:
+        for line in f:
+            try:
+                parsed = _parse_line(line, pipeline.labels)
+            except ValueError:
+                # Header CSV atau baris rusak
+                continue
+            if parsed is None:
+                continue
+            await pipeline.put(*parsed)
+            sent += 1
+            if rate:
+                delay = sent / rate - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+    return sent
+
+
+async def serve_socket(pipeline, host="127.0.0.1", port=8765):
+    """
+    Terima pembacaan (satu JSON/CSV per baris) dari banyak koneksi TCP.
+    Karena put() menunggu saat antrean penuh, pembacaan socket ikut tertahan.
+    """
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    parsed = _parse_line(line.decode("utf-8"), pipeline.labels)
+                except ValueError:
+                    continue
+                if parsed is not None:
+                    await pipeline.put(*parsed)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _main_async(args):
+    from batch_engine import create_batch_engine
+
+    pipeline = AQIPipeline(
+        create_batch_engine(sparse_rules=True),
+        batch_size=args.batch_size,
+        max_delay=args.max_delay,
+        max_queue=args.max_queue,
+    ).start()
+
+    async def consume():
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            async for results in pipeline.batches():
+                output.write("".join(json.dumps(result) + "\n" for result in results))
+        finally:
+            if args.output:
+                output.close()
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.metrics_interval)
+            print(json.dumps(pipeline.metrics()), file=sys.stderr)
+
+    consumer = asyncio.create_task(consume())
+    reporter = asyncio.create_task(report()) if args.metrics_interval else None
+    try:
+        if args.listen:
+            server = await serve_socket(pipeline, args.host, args.listen)
+            print(f"Menerima pembacaan di {args.host}:{args.listen}", file=sys.stderr)
+            # Berhenti dengan rapi (hasil yang tertunda tetap ditulis) saat
+            # Ctrl-C atau SIGTERM dari orkestrator
+            stop = asyncio.Event()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+            async with server:
+                await stop.wait()
+        else:
+            await asyncio.gather(*(file_producer(pipeline, path, args.rate) for path in args.files))
+    finally:
+        await pipeline.close()
+        await consumer
+        if reporter is not None:
+            reporter.cancel()
+        print(json.dumps(pipeline.metrics()), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline asyncio penilaian AQI dengan micro-batching")
+    parser.add_argument("files", nargs="*", help="File pembacaan (JSON lines atau CSV station,nilai...)")
+    parser.add_argument("--listen", type=int, metavar="PORT", help="Terima pembacaan lewat TCP, bukan dari file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--output", help="Tulis hasil ke file (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--max-delay", type=float, default=0.05, help="Batas tunggu micro-batch (detik)")
+    parser.add_argument("--max-queue", type=int, default=10_000, help="Kapasitas antrean input")
+    parser.add_argument("--rate", type=float, help="Batas pembacaan per detik per file")
+    parser.add_argument("--metrics-interval", type=float, default=0, help="Cetak metrik tiap N detik")
+    args = parser.parse_args(argv)
+    if not args.files and not args.listen:
+        parser.error("Berikan file pembacaan atau --listen PORT")
+    try:
+        asyncio.run(_main_async(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
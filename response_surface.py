@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from rule_compiler import UNUSED
+from system_artifact import BASE_DIR, version_hash
+from variables import INPUT_BREAKPOINTS, INPUT_LABELS, INPUT_RANGES, MEMBERSHIP_FUNCTIONS
+
+DEFAULT_SURFACE = os.environ.get("AQI_RESPONSE_SURFACE", os.path.join(BASE_DIR, "build", "aqi_surface"))
+# Jumlah baris per panggilan mesin saat membangun grid
+BUILD_CHUNK = 1 << 18
+
+
+def surface_axes(rules, segments=2):
+    """
+    Titik grid tiap input: titik sudut fungsi keanggotaan (di situlah derajat
+    keanggotaan berubah kemiringan), dengan tiap selang di antaranya dibagi
+    lagi menjadi ``segments`` bagian (satu angka atau dict {label: angka}).
+
+    Hanya wilayah yang dicakup term yang dipakai ``rules`` (CompiledRules)
+    yang diberi titik; di atasnya tidak ada rule yang bisa aktif, jadi cukup
+    satu titik di batas atas universe. CO misalnya hanya dipakai dengan term
+    "baik", sehingga cukup belasan titik, bukan 54.166.
+    """
+    if not isinstance(segments, dict):
+        segments = {label: segments for label in INPUT_LABELS}
+    axes = []
+    for var, label in enumerate(INPUT_LABELS):
+        upper, terms = MEMBERSHIP_FUNCTIONS[label]
+        used = set(rules.antecedents[:, var].tolist())
+        # Rule yang tidak memakai variabel ini aktif di seluruh universe
+        if UNUSED in used:
+            used = set(range(len(terms)))
+        end = max(terms[t][2][-1] for t in used)
+        corners = np.unique([p for _, _, params in terms for p in params if p <= end] + [0, end])
+        k = segments.get(label, 1)
+        pieces = [np.linspace(a, b, k + 1)[:-1] for a, b in zip(corners[:-1], corners[1:])]
+        axis = np.concatenate(pieces + [[end]] + ([[upper]] if end < upper else []))
+        axes.append(axis.astype(np.float64))
+    return axes
+
+
+def _grid_points(axes, start, stop):
+    """Koordinat titik grid dengan indeks datar [start, stop)"""
+    index = np.unravel_index(np.arange(start, stop), [axis.size for axis in axes])
+    return np.column_stack([axis[i] for axis, i in zip(axes, index)])
+
+
+class ResponseSurface:
+    """
+    AQI yang sudah dihitung di grid 6 dimensi, dijawab dengan interpolasi
+    multilinear. Dipakai seperti BatchAQIEngine: ``surface.compute(array)``.
+
+    Tetangga grid tanpa rule aktif diabaikan; titik yang semua tetangganya
+    tanpa rule aktif menghasilkan NaN. ``error`` berisi laporan error_report
+    yang diukur saat surface dibangun (None bila tidak ada).
+    """
+
+    def __init__(self, axes, values, block_size=65536, error=None):
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        self.error = error
+        self.values = values.reshape(-1)
+        self.labels = INPUT_LABELS
+        self.block_size = block_size
+        shape = [axis.size for axis in self.axes]
+        self._strides = np.array([int(np.prod(shape[d + 1 :])) for d in range(len(shape))], dtype=np.intp)
+
+    def _interpolate(self, inputs):
+        n, n_dims = inputs.shape
+        base = np.zeros(n, dtype=np.intp)
+        fractions = np.empty((n, n_dims))
+        for d, axis in enumerate(self.axes):
+            x = np.clip(inputs[:, d], axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, axis.size - 2)
+            fractions[:, d] = (x - axis[i]) / (axis[i + 1] - axis[i])
+            base += i * self._strides[d]
+
+        # Sudut tanpa rule aktif (NaN) dilewati dan bobot sisanya dinormalkan,
+        # jadi titik di dekat batas wilayah rule tetap mendapat nilai; baris
+        # yang semua sudutnya NaN menghasilkan NaN
+        total = np.zeros(n)
+        weight_sum = np.zeros(n)
+        for corner in range(1 << n_dims):
+            weight = np.ones(n)
+            offset = 0
+            for d in range(n_dims):
+                if (corner >> d) & 1:
+                    weight *= fractions[:, d]
+                    offset += self._strides[d]
+                else:
+                    weight *= 1.0 - fractions[:, d]
+            values = self.values[base + offset]
+            valid = (weight > 0) & ~np.isnan(values)
+            total[valid] += weight[valid] * values[valid]
+            weight_sum[valid] += weight[valid]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(weight_sum > 0, total / weight_sum, np.nan)
+
+    def compute(self, data):
+        """Hitung AQI untuk array (n, 6) atau DataFrame dengan kolom INPUT_LABELS"""
+        if hasattr(data, "columns"):
+            data = data[list(self.labels)].to_numpy()
+        inputs = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        if inputs.shape[1] != len(self.labels):
+            raise ValueError(f"Input harus memiliki {len(self.labels)} kolom: {', '.join(self.labels)}")
+        result = np.empty(inputs.shape[0])
+        for start in range(0, inputs.shape[0], self.block_size):
+            result[start : start + self.block_size] = self._interpolate(inputs[start : start + self.block_size])
+        return result
+
+
+def build_surface(path=DEFAULT_SURFACE, segments=2, workers=1, progress=None, samples=100_000):
+    """
+    Hitung AQI di setiap titik grid surface_axes dengan mesin yang
+    sama seperti kalkulator, lalu simpan ke ``path`` (values.npy float32 dan
+    meta.json). ``workers`` > 1 (atau 0 = semua core) memakai ParallelScorer.
+    Error interpolasi diukur dengan error_report pada ``samples`` titik acak
+    dan disimpan di meta.json, supaya pemakai surface tahu seberapa jauh
+    hasilnya bisa meleset dari mesin eksak.
+    """
+    from batch_engine import create_batch_engine
+    from parallel import ParallelScorer
+
+    engine_options = {"resolution": INPUT_BREAKPOINTS, "sparse_rules": True}
+    engine = create_batch_engine(**engine_options)
+    axes = surface_axes(engine.rules, segments)
+    shape = tuple(axis.size for axis in axes)
+    total = int(np.prod(shape))
+    if workers != 1:
+        engine = ParallelScorer(workers=workers or None, **engine_options)
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".aqi_surface-", dir=parent)
+    start_time = time.perf_counter()
+    try:
+        values = np.lib.format.open_memmap(
+            os.path.join(staging, "values.npy"), mode="w+", dtype=np.float32, shape=shape
+        )
+        flat = values.reshape(-1)
+        for start in range(0, total, BUILD_CHUNK):
+            stop = min(start + BUILD_CHUNK, total)
+            flat[start:stop] = engine.compute(_grid_points(axes, start, stop))
+            if progress is not None:
+                progress(stop, total, time.perf_counter() - start_time)
+        values.flush()
+        del flat, values
+        build_seconds = time.perf_counter() - start_time
+
+        values = np.load(os.path.join(staging, "values.npy"), mmap_mode="r")
+        error = error_report(ResponseSurface(axes, values), n=samples)
+        del values
+
+        meta = {
+            "version": version_hash(INPUT_BREAKPOINTS),
+            "segments": segments,
+            "axes": [axis.tolist() for axis in axes],
+            "build_seconds": build_seconds,
+            "error": error,
+        }
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        if isinstance(engine, ParallelScorer):
+            engine.close()
+    return load_surface(path)
+
+
+def load_surface(path=DEFAULT_SURFACE, max_error=None):
+    """
+    Muat ResponseSurface dengan memory-map. Melempar ValueError bila surface
+    dibangun dari rule/fungsi keanggotaan yang berbeda, atau bila
+    ``max_error`` diberikan dan error maksimum yang terukur di wilayah rule
+    melebihinya (atau tidak pernah diukur).
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["version"] != version_hash(INPUT_BREAKPOINTS):
+        raise ValueError(f"Response surface di {path} sudah usang; bangun ulang dengan response_surface.py")
+    error = meta.get("error")
+    if max_error is not None:
+        if error is None:
+            raise ValueError(f"Error response surface di {path} belum diukur; bangun ulang dengan response_surface.py")
+        measured = error["rule_region"]["max_error"]
+        if measured > max_error:
+            raise ValueError(
+                f"Error maksimum response surface di {path} {measured:.1f} AQI, melebihi batas {max_error:g}; "
+                "bangun ulang dengan --segments/--segment yang lebih besar"
+            )
+    return ResponseSurface(meta["axes"], np.load(os.path.join(path, "values.npy"), mmap_mode="r"), error=error)
+
+
+def error_report(surface, n=100_000, seed=0):
+    """
+    Selisih surface terhadap mesin eksak pada sampel acak, baik di seluruh
+    domain input maupun di wilayah tempat rule-rule berada (lihat
+    variables.INPUT_RANGES), beserta throughput keduanya.
+    """
+    from batch_engine import create_batch_engine
+
+    engine = create_batch_engine(resolution=INPUT_BREAKPOINTS, sparse_rules=True)
+    rng = np.random.default_rng(seed)
+    uppers = np.array([MEMBERSHIP_FUNCTIONS[label][0] for label in INPUT_LABELS], dtype=np.float64)
+    report = {}
+    for name, bounds in (("domain", uppers), ("rule_region", np.array(INPUT_RANGES, dtype=np.float64))):
+        inputs = rng.random((n, len(INPUT_LABELS))) * bounds
+        start = time.perf_counter()
+        expected = engine.compute(inputs)
+        t_exact = time.perf_counter() - start
+        start = time.perf_counter()
+        values = surface.compute(inputs)
+        t_surface = time.perf_counter() - start
+
+        both = ~np.isnan(expected) & ~np.isnan(values)
+        error = np.abs(values[both] - expected[both])
+        report[name] = {
+            "max_error": float(error.max()) if error.size else 0.0,
+            "mean_error": float(error.mean()) if error.size else 0.0,
+            "p99_error": float(np.percentile(error, 99)) if error.size else 0.0,
+            "nan_mismatch": int((np.isnan(expected) != np.isnan(values)).sum()),
+            "exact_rows_per_second": n / t_exact,
+            "surface_rows_per_second": n / t_surface,
+        }
+    return report
+
+
+def _print_progress(done, total, elapsed):
+    print(f"\r{done:,}/{total:,} titik grid ({done / elapsed:,.0f} titik/detik)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun response surface AQI untuk interpolasi cepat")
+    parser.add_argument("--path", default=DEFAULT_SURFACE, help="Direktori surface")
+    parser.add_argument("--segments", type=int, default=2, help="Pembagian tiap selang antar titik sudut")
+    parser.add_argument(
+        "--segment",
+        action="append",
+        metavar="LABEL=N",
+        help="Pembagian khusus untuk satu parameter, misalnya PM2.5=4 (boleh diulang)",
+    )
+    parser.add_argument("--workers", type=int, default=0, help="Jumlah proses (0 = semua core)")
+    parser.add_argument("--samples", type=int, default=100_000, help="Jumlah sampel untuk laporan error")
+    parser.add_argument("--quiet", action="store_true", help="Jangan tampilkan progres")
+    args = parser.parse_args(argv)
+
+    segments = {label: args.segments for label in INPUT_LABELS}
+    for pair in args.segment or []:
+        label, _, count = pair.partition("=")
+        if label not in segments or not count.isdigit() or int(count) < 1:
+            parser.error(f"Pembagian tidak valid: {pair}")
+        segments[label] = int(count)
+
+    surface = build_surface(
+        args.path, segments, args.workers, progress=None if args.quiet else _print_progress, samples=args.samples
+    )
+    print(file=sys.stderr)
+    print(json.dumps(surface.error, indent=2))
+
+
+if __name__ == "__main__":
+    main()
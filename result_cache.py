@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    Cache LRU dengan TTL opsional yang aman dipakai banyak thread.
+
+    Dipakai untuk hasil perhitungan AQI per tuple (PM2.5, PM10, CO, NO2, O3,
+    SO2). ``maxsize`` membatasi jumlah entri (entri paling lama tidak dipakai
+    dibuang lebih dulu), ``ttl`` dalam detik membatasi umur entri. Entri
+    yang dibuang karena cache penuh dihitung di ``evictions``, yang
+    kedaluwarsa di ``expirations``.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize harus minimal 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Ambil nilai untuk ``key``; ``default`` bila tidak ada atau kedaluwarsa"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or expires > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Simpan nilai, membuang entri paling lama bila cache penuh"""
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, func):
+        """
+        Ambil dari cache atau hitung dengan ``func()`` lalu simpan. Perhitungan
+        dilakukan di luar lock sehingga sesi lain tidak ikut menunggu;
+        exception dari ``func`` tidak disimpan.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Statistik cache dalam bentuk dict"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,286 @@
+import numpy as np
+
+# Indeks term untuk variabel yang tidak dipakai sebuah rule
+UNUSED = -1
+# Batas elemen gather (baris x rule x variabel) per langkah CompiledRules.fire;
+# 2^24 float64 = 128 MB, cukup untuk 430 rule dengan blok 4096 baris sekaligus
+FIRE_ELEMENTS = 1 << 24
+
+
+def _rule_terms(rule):
+    """Ambil daftar term antecedent dari rule yang hanya memakai operator AND"""
+    from skfuzzy.control.term import Term, TermAggregate
+
+    def _walk(node):
+        if isinstance(node, Term):
+            return [node]
+        if isinstance(node, TermAggregate) and node.kind == "and":
+            return _walk(node.term1) + _walk(node.term2)
+        raise ValueError(f"Rule '{rule.label}' memakai operator yang tidak didukung")
+
+    return _walk(rule.antecedent)
+
+
+class RuleIndex:
+    """
+    Indeks term -> rule untuk menyalakan hanya rule yang mungkin aktif.
+
+    Untuk tiap variabel disimpan himpunan rule per term (sebagai mask
+    boolean) dan himpunan rule yang tidak memakai variabel itu. Rule dengan
+    kekuatan > 0 pasti termasuk gabungan term yang aktif di setiap variabel
+    atau tidak memakai variabel tersebut, jadi kandidatnya adalah irisan dari
+    gabungan tersebut. Kandidat dihitung sekali per pola term aktif dan
+    disimpan, karena baris-baris yang berdekatan memakai pola yang sama.
+    """
+
+    def __init__(self, antecedents, max_terms, max_patterns=65536):
+        self.max_terms = max_terms
+        self.max_patterns = max_patterns
+        # (n_variabel, max_term, n_rules): rule yang memakai term tersebut, dan
+        # (n_variabel, n_rules): rule yang tidak memakai variabelnya sama
+        # sekali. Yang terakhir tetap kandidat walau tidak ada term aktif.
+        terms = np.arange(max_terms)[None, :, None]
+        columns = antecedents.T[:, None, :]
+        self._term_rules = columns == terms
+        self._unused = antecedents.T == UNUSED
+        self._candidates = {}
+
+    def candidates(self, active):
+        """Id rule (terurut) yang semua antecedent-nya aktif; ``active`` (n_variabel, max_term) bool"""
+        key = np.packbits(active).tobytes()
+        rules = self._candidates.get(key)
+        if rules is None:
+            mask = np.ones(self._term_rules.shape[2], dtype=bool)
+            for term_rules, unused, terms in zip(self._term_rules, self._unused, active):
+                mask &= term_rules[terms].any(axis=0) | unused
+            rules = np.flatnonzero(mask)
+            if len(self._candidates) >= self.max_patterns:
+                self._candidates.clear()
+            self._candidates[key] = rules
+        return rules
+
+    def pairs(self, memberships):
+        """
+        Pasangan (baris, rule) yang perlu dinyalakan untuk ``memberships``
+        (n, n_variabel, max_term).
+        """
+        n = memberships.shape[0]
+        active = memberships > 0
+        patterns, first, inverse = np.unique(
+            np.packbits(active.reshape(n, -1), axis=1), axis=0, return_index=True, return_inverse=True
+        )
+        candidates = [self.candidates(active[i]) for i in first]
+        lengths = np.array([c.size for c in candidates], dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.intp)
+        flat = np.concatenate(candidates).astype(np.intp) if candidates else np.empty(0, dtype=np.intp)
+
+        inverse = inverse.reshape(-1)
+        row_lengths = lengths[inverse]
+        rows = np.repeat(np.arange(n), row_lengths)
+        # Posisi tiap pasangan di dalam daftar kandidat barisnya
+        position = np.arange(rows.size) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        return rows, flat[offsets[inverse][rows] + position]
+
+
+class CompiledRules:
+    """
+    Basis rule dalam bentuk tabel integer.
+
+    ``antecedents`` berukuran (n_rules, n_variabel) berisi indeks term tiap
+    variabel (UNUSED bila variabel tidak dipakai), ``consequents`` berukuran
+    (n_rules,) berisi indeks term output.
+    """
+
+    def __init__(self, antecedents, consequents, variable_labels, term_labels, output_terms):
+        self.antecedents = np.asarray(antecedents, dtype=np.int8)
+        self.consequents = np.asarray(consequents, dtype=np.int8)
+        self.variable_labels = tuple(variable_labels)
+        self.term_labels = tuple(tuple(labels) for labels in term_labels)
+        self.output_terms = tuple(output_terms)
+
+        # Indeks datar ke array keanggotaan (n, n_variabel * max_term + 1).
+        # Kolom terakhir bernilai 1 sehingga variabel yang tidak dipakai tidak
+        # memengaruhi min.
+        self.max_terms = max(len(labels) for labels in self.term_labels)
+        n_vars = len(self.variable_labels)
+        offsets = np.arange(n_vars) * self.max_terms
+        self._gather = np.where(
+            self.antecedents == UNUSED, n_vars * self.max_terms, self.antecedents + offsets
+        ).astype(np.intp)
+
+        # Rule diurutkan per konsekuen agar max bisa memakai reduceat
+        self._order = np.argsort(self.consequents, kind="stable")
+        sorted_consequents = self.consequents[self._order]
+        self._used_outputs, self._starts = np.unique(sorted_consequents, return_index=True)
+        self._gather_sorted = self._gather[self._order]
+
+        self._index = None
+
+    @property
+    def index(self):
+        """RuleIndex untuk penyalaan sparse, dibangun saat pertama dipakai"""
+        if self._index is None:
+            self._index = RuleIndex(self.antecedents, self.max_terms)
+        return self._index
+
+    @classmethod
+    def from_table(cls, antecedents, consequents, variable_labels, term_labels, output_terms):
+        """
+        CompiledRules dari tabel, atau rule_grid.GridRules bila tabel berisi
+        tepat satu rule untuk setiap kombinasi term dengan urutan
+        np.ravel_multi_index (seperti hasil rule_grid.generate_rules), agar
+        tabel lengkap tetap dinyalakan lewat jalur kombinasinya.
+        """
+        antecedents = np.asarray(antecedents, dtype=np.int8)
+        shape = tuple(len(labels) for labels in term_labels)
+        if (
+            antecedents.shape == (int(np.prod(shape)), len(shape))
+            and not (antecedents == UNUSED).any()
+            and np.array_equal(np.ravel_multi_index(antecedents.T.astype(np.intp), shape), np.arange(len(antecedents)))
+        ):
+            from rule_grid import GridRules
+
+            return GridRules(np.reshape(consequents, shape), variable_labels, term_labels, output_terms)
+        return cls(antecedents, consequents, variable_labels, term_labels, output_terms)
+
+    def __len__(self):
+        return len(self.consequents)
+
+    def fire(self, memberships):
+        """
+        Nyalakan semua rule sekaligus (per potongan rule bila gather-nya
+        melebihi FIRE_ELEMENTS).
+
+        ``memberships`` berukuran (n, n_variabel, max_term). Mengembalikan
+        kekuatan tiap term output (n, n_term_output).
+        """
+        n, n_vars = memberships.shape[:2]
+        flat = np.concatenate([memberships.reshape(n, -1), np.ones((n, 1))], axis=1)
+        cuts = np.zeros((n, len(self.output_terms)))
+        step = max(1, FIRE_ELEMENTS // max(1, n * n_vars))
+        if step >= len(self):
+            # Satu gather (n, n_rules, n_variabel) lalu min per rule
+            strengths = flat[:, self._gather_sorted].min(axis=2)
+            cuts[:, self._used_outputs] = np.maximum.reduceat(strengths, self._starts, axis=1)
+            return cuts
+
+        # Tabel besar: gather per potongan rule agar memori tetap terbatas
+        consequents = self.consequents[self._order]
+        for start in range(0, len(self), step):
+            strengths = flat[:, self._gather_sorted[start : start + step]].min(axis=2)
+            chunk = consequents[start : start + step]
+            starts = np.flatnonzero(np.concatenate([[True], chunk[1:] != chunk[:-1]]))
+            outputs = chunk[starts]
+            cuts[:, outputs] = np.maximum(cuts[:, outputs], np.maximum.reduceat(strengths, starts, axis=1))
+        return cuts
+
+    def rules_using(self, var):
+        """Id rule yang memakai variabel ke-``var``"""
+        return np.flatnonzero(self.antecedents[:, var] != UNUSED)
+
+    def strengths(self, flat, rules):
+        """
+        Kekuatan (min) rule ``rules`` untuk satu pembacaan. ``flat`` berupa
+        keanggotaan datar (n_variabel * max_term + 1,) dengan elemen terakhir 1.
+        """
+        return flat[self._gather[rules]].min(axis=1)
+
+    def aggregate(self, strengths):
+        """Kekuatan tiap term output (max per konsekuen) dari kekuatan semua rule (n_rules,)"""
+        cuts = np.zeros(len(self.output_terms))
+        cuts[self._used_outputs] = np.maximum.reduceat(strengths[self._order], self._starts)
+        return cuts
+
+    def rule_strengths(self, memberships):
+        """Kekuatan tiap rule (n, n_rules), urutan rule seperti tabel"""
+        n = memberships.shape[0]
+        flat = np.concatenate([memberships.reshape(n, -1), np.ones((n, 1))], axis=1)
+        return flat[:, self._gather].min(axis=2)
+
+    def fire_sparse(self, memberships):
+        """
+        Seperti fire(), tetapi hanya rule yang semua antecedent-nya aktif yang
+        dinyalakan (lihat RuleIndex). Rule lain berkekuatan 0 sehingga hasilnya
+        identik, dan biayanya tidak lagi tumbuh linear dengan jumlah rule.
+        """
+        n = memberships.shape[0]
+        n_out = len(self.output_terms)
+        rows, rules = self.index.pairs(memberships)
+        flat = np.concatenate([memberships.reshape(n, -1), np.ones((n, 1))], axis=1)
+        strengths = flat[rows[:, None], self._gather[rules]].min(axis=1)
+
+        cuts = np.zeros(n * n_out)
+        np.maximum.at(cuts, rows * n_out + self.consequents[rules], strengths)
+        return cuts.reshape(n, n_out)
+
+    @property
+    def used_outputs(self):
+        """Mask term output yang dipakai paling sedikit satu rule"""
+        mask = np.zeros(len(self.output_terms), dtype=bool)
+        mask[self._used_outputs] = True
+        return mask
+
+    def save(self, path, version=None):
+        """Simpan tabel rule ke file .npz, beserta hash versi sumbernya bila diberikan"""
+        extra = {} if version is None else {"version": np.array(version)}
+        np.savez(
+            path,
+            **extra,
+            antecedents=self.antecedents,
+            consequents=self.consequents,
+            variable_labels=np.array(self.variable_labels),
+            term_labels=np.array([label for labels in self.term_labels for label in labels]),
+            term_counts=np.array([len(labels) for labels in self.term_labels]),
+            output_terms=np.array(self.output_terms),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Muat tabel rule dari file .npz hasil save() (GridRules bila tabelnya lengkap, lihat from_table)"""
+        with np.load(path) as data:
+            flat = data["term_labels"].tolist()
+            bounds = np.cumsum(np.concatenate([[0], data["term_counts"]]))
+            return CompiledRules.from_table(
+                data["antecedents"],
+                data["consequents"],
+                data["variable_labels"].tolist(),
+                [flat[start:end] for start, end in zip(bounds[:-1], bounds[1:])],
+                data["output_terms"].tolist(),
+            )
+
+    @staticmethod
+    def saved_version(path):
+        """Hash versi di file .npz hasil save() (None bila tidak ada atau file tidak terbaca)"""
+        try:
+            with np.load(path) as data:
+                return str(data["version"]) if "version" in data.files else None
+        except (OSError, ValueError):
+            return None
+
+    def check_variables(self, antecedents, consequent):
+        """Pastikan tabel cocok dengan variabel fuzzy yang dipakai"""
+        if tuple(var.label for var in antecedents) != self.variable_labels or tuple(
+            tuple(var.terms) for var in antecedents
+        ) != self.term_labels or tuple(consequent.terms) != self.output_terms:
+            raise ValueError("Tabel rule tidak cocok dengan variabel fuzzy")
+
+
+def compile_rules(rules, antecedents, consequent):
+    """Ubah daftar ctrl.Rule menjadi CompiledRules"""
+    variable_labels = [var.label for var in antecedents]
+    term_labels = [list(var.terms) for var in antecedents]
+    output_terms = list(consequent.terms)
+
+    table = np.full((len(rules), len(antecedents)), UNUSED, dtype=np.int8)
+    consequents = np.empty(len(rules), dtype=np.int8)
+    for i, rule in enumerate(rules):
+        for term in _rule_terms(rule):
+            var = variable_labels.index(term.parent.label)
+            if table[i, var] != UNUSED:
+                raise ValueError(f"Rule '{rule.label}' memakai variabel {term.parent.label} lebih dari sekali")
+            table[i, var] = term_labels[var].index(term.label)
+        if len(rule.consequent) != 1 or rule.consequent[0].weight != 1.0:
+            raise ValueError(f"Rule '{rule.label}' harus memiliki satu konsekuen tanpa bobot")
+        consequents[i] = output_terms.index(rule.consequent[0].term.label)
+
+    return CompiledRules(table, consequents, variable_labels, term_labels, output_terms)
@@ -0,0 +1,237 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from rule_compiler import CompiledRules
+from variables import INPUT_LABELS, INPUT_RANGES, MEMBERSHIP_FUNCTIONS, OUTPUT_LABEL
+
+# Bobot tiap parameter untuk kebijakan "weighted"; partikulat paling menentukan
+SEVERITY_WEIGHTS = {"PM2.5": 3.0, "PM10": 2.0, "CO": 1.0, "NO2": 1.0, "O3": 1.0, "SO2": 1.0}
+
+
+def max_subindex(terms):
+    """Term output = term terburuk di antara semua parameter (seperti AQI EPA)"""
+    return terms.max(axis=1)
+
+
+def weighted_severity(terms, weights=SEVERITY_WEIGHTS):
+    """
+    Term output = rata-rata berbobot tingkat term (dibulatkan), tetapi tidak
+    lebih dari satu tingkat di bawah term terburuk.
+    """
+    w = np.array([weights[label] for label in INPUT_LABELS])
+    mean = np.floor(terms @ w / w.sum() + 0.5).astype(terms.dtype)
+    return np.maximum(mean, terms.max(axis=1) - 1)
+
+
+POLICIES = {"max": max_subindex, "weighted": weighted_severity}
+
+
+class GridRules(CompiledRules):
+    """
+    Basis rule lengkap: satu rule untuk setiap kombinasi term (6^6 = 46.656).
+
+    Karena rule ke-i adalah kombinasi dengan indeks campuran i
+    (np.ravel_multi_index), rule yang aktif bisa langsung dihitung dari term
+    yang aktif di tiap variabel tanpa RuleIndex: dengan paling banyak A term
+    aktif per variabel hanya A^6 kombinasi (64 untuk A = 2) per baris yang
+    dinyalakan. Hasilnya identik dengan CompiledRules.fire.
+    """
+
+    def __init__(self, table, variable_labels, term_labels, output_terms):
+        self.table = np.asarray(table, dtype=np.int8)
+        antecedents = np.indices(self.table.shape).reshape(self.table.ndim, -1).T
+        super().__init__(antecedents, self.table.reshape(-1), variable_labels, term_labels, output_terms)
+        self._strides = np.array(
+            [int(np.prod(self.table.shape[v + 1 :])) for v in range(self.table.ndim)], dtype=np.intp
+        )
+        # Indeks kombinasi per jumlah term aktif
+        self._combos = {}
+
+    def fire(self, memberships):
+        # Versi padat butuh array (n, 46.656, 6); selalu pakai jalur kombinasi
+        return self.fire_sparse(memberships)
+
+    def fire_sparse(self, memberships):
+        n, n_vars, n_terms = memberships.shape
+        cuts = np.zeros((n, len(self.output_terms)))
+        if n == 0:
+            return cuts
+        width = max(1, int((memberships > 0).sum(axis=2).max()))
+        combos = self._combos.get(width)
+        if combos is None:
+            combos = self._combos[width] = np.indices((width,) * n_vars).reshape(n_vars, -1)
+        # ``width`` term terkuat tiap variabel; bila kurang dari itu yang
+        # aktif, sisanya berderajat 0 sehingga kombinasinya tidak berpengaruh
+        if width < n_terms:
+            order = np.argpartition(-memberships, width - 1, axis=2)[:, :, :width]
+        else:
+            order = np.broadcast_to(np.arange(n_terms), memberships.shape)
+        degree = np.take_along_axis(memberships, order, axis=2)
+
+        # (n, n_variabel, kombinasi) sekaligus, lalu min antar variabel
+        var = np.arange(n_vars)[:, None]
+        strengths = degree[:, var, combos].min(axis=1)
+        rule_ids = (order[:, var, combos] * self._strides[:, None]).sum(axis=1)
+        np.maximum.at(cuts, (np.arange(n)[:, None], self.consequents[rule_ids]), strengths)
+        return cuts
+
+    def rule_strengths(self, memberships):
+        """Kekuatan tiap rule (n, 46.656) lewat min luar antar variabel, tanpa gather (n, rule, 6)"""
+        n = memberships.shape[0]
+        shape = self.table.shape
+        strengths = memberships[:, 0, : shape[0]]
+        for v in range(1, len(shape)):
+            degree = memberships[:, v, : shape[v]].reshape((n,) + (1,) * v + (shape[v],))
+            strengths = np.minimum(strengths[..., None], degree)
+        return strengths.reshape(n, -1)
+
+
+def generate_rules(policy="max"):
+    """
+    Bangun GridRules dari kebijakan ringkas: nama di POLICIES atau fungsi
+    yang menerima array term (n_rules, 6) dan mengembalikan indeks term
+    output (n_rules,). Tidak memerlukan scikit-fuzzy.
+    """
+    func = POLICIES[policy] if isinstance(policy, str) else policy
+    term_labels = [[name for name, _, _ in MEMBERSHIP_FUNCTIONS[label][1]] for label in INPUT_LABELS]
+    output_terms = [name for name, _, _ in MEMBERSHIP_FUNCTIONS[OUTPUT_LABEL][1]]
+    shape = tuple(len(labels) for labels in term_labels)
+    terms = np.indices(shape).reshape(len(shape), -1).T
+    consequents = np.clip(np.asarray(func(terms)), 0, len(output_terms) - 1)
+    return GridRules(consequents.reshape(shape), INPUT_LABELS, term_labels, output_terms)
+
+
+def create_grid_engine(policy="max", resolution=None, **options):
+    """BatchAQIEngine dengan basis rule lengkap dari ``policy`` (lihat generate_rules)"""
+    from batch_engine import BatchAQIEngine
+    from variables import create_variables
+
+    variables = create_variables(resolution)
+    return BatchAQIEngine(variables[:6], variables[6], generate_rules(policy), **options)
+
+
+def hand_rule_agreement(policy="max"):
+    """Fraksi rule di rules.py yang konsekuennya sama dengan ``policy``"""
+    from rule_compiler import compile_rules
+    from rules import create_rules
+    from variables import create_variables
+
+    # Langsung dari rules.py, bukan salinannya di rules.csv yang bisa usang
+    variables = create_variables()
+    hand = compile_rules(create_rules(*variables), variables[:6], variables[6])
+    grid = generate_rules(policy)
+    index = np.ravel_multi_index(hand.antecedents.astype(np.intp).T, grid.table.shape)
+    return float((grid.consequents[index] == hand.consequents).mean())
+
+
+def _rules_bytes(rules):
+    """Ukuran array rule termasuk indeks bantu (RuleIndex bila sudah dibuat)"""
+    total = sum(
+        getattr(rules, name).nbytes
+        for name in ("antecedents", "consequents", "_gather", "_gather_sorted", "_order")
+    )
+    if isinstance(rules, GridRules):
+        total += rules.table.nbytes
+    elif rules._index is not None:
+        total += rules._index._term_rules.nbytes
+    return total
+
+
+def benchmark(policy="max", samples=20_000, single=300, seed=0):
+    """
+    Bandingkan sistem 430 rule (create_rules) dengan grid lengkap: waktu
+    cold start, memori, latensi satu pembacaan, throughput batch, dan
+    fraksi pembacaan tanpa rule aktif.
+    """
+    from batch_engine import BatchAQIEngine
+    from rule_compiler import compile_rules
+    from rules import create_rules
+    from variables import create_variables
+
+    variables = create_variables()
+
+    def build_hand():
+        return compile_rules(create_rules(*variables), variables[:6], variables[6])
+
+    uppers = np.array([MEMBERSHIP_FUNCTIONS[label][0] for label in INPUT_LABELS], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    regions = {
+        "domain": rng.random((samples, len(INPUT_LABELS))) * uppers,
+        "rule_region": rng.random((samples, len(INPUT_LABELS))) * np.array(INPUT_RANGES, dtype=np.float64),
+    }
+
+    report = {}
+    for name, build in (("rules_430", build_hand), ("grid", lambda: generate_rules(policy))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        rules = build()
+        t_rules = time.perf_counter() - start
+        engine = BatchAQIEngine(variables[:6], variables[6], rules, sparse_rules=True)
+        t_engine = time.perf_counter() - start - t_rules
+        # Pembacaan pertama ikut dihitung (termasuk membangun RuleIndex)
+        engine.compute(regions["rule_region"][:1])
+        t_first = time.perf_counter() - start - t_rules - t_engine
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Median per pembacaan: penyalaan rule saja (keanggotaan sudah
+        # dihitung) dan compute() lengkap
+        readings = regions["rule_region"][:single]
+        memberships = [engine.fuzzify(row[None, :]) for row in readings]
+        times = []
+        for m in memberships:
+            start = time.perf_counter()
+            engine.rules.fire_sparse(m)
+            times.append(time.perf_counter() - start)
+        fire_us = float(np.median(times)) * 1e6
+        times = []
+        for row in readings:
+            start = time.perf_counter()
+            engine.compute(row[None, :])
+            times.append(time.perf_counter() - start)
+        compute_us = float(np.median(times)) * 1e6
+
+        entry = {
+            "rules": len(rules),
+            "cold_start": {"build_rules_s": t_rules, "engine_init_s": t_engine, "first_compute_s": t_first},
+            "memory": {"build_peak_bytes": peak, "rules_bytes": _rules_bytes(rules)},
+            "single_reading_us": {"fire_rules": fire_us, "compute": compute_us},
+        }
+        for region, inputs in regions.items():
+            start = time.perf_counter()
+            values = engine.compute(inputs)
+            elapsed = time.perf_counter() - start
+            entry[region] = {"rows_per_second": samples / elapsed, "no_rule_fraction": float(np.isnan(values).mean())}
+        report[name] = entry
+    report["grid"]["policy"] = policy if isinstance(policy, str) else getattr(policy, "__name__", "custom")
+    report["grid"]["hand_rule_agreement"] = hand_rule_agreement(policy)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun basis rule 6^6 lengkap dari kebijakan ringkas")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="max")
+    parser.add_argument("--output", help="Simpan tabel rule (.csv lewat rule_table, selainnya .npz)")
+    parser.add_argument("--samples", type=int, default=20_000, help="Jumlah sampel benchmark")
+    parser.add_argument("--no-benchmark", action="store_true")
+    args = parser.parse_args(argv)
+
+    rules = generate_rules(args.policy)
+    if args.output:
+        if args.output.endswith(".csv"):
+            from rule_table import write_rule_table
+
+            write_rule_table(args.output, rules)
+        else:
+            rules.save(args.output)
+        print(f"{len(rules):,} rule ditulis ke {args.output}")
+    if not args.no_benchmark:
+        print(json.dumps(benchmark(args.policy, samples=args.samples), indent=2))
+
+
+if __name__ == "__main__":
+    main()
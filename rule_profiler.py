@@ -0,0 +1,269 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from batch_engine import create_batch_engine
+from rule_compiler import UNUSED, CompiledRules
+from variables import INPUT_LABELS, INPUT_RANGES, MEMBERSHIP_FUNCTIONS
+
+# Batas sampel acak: seluruh universe, atau wilayah tempat rule-rule berada
+REGIONS = {
+    "domain": tuple(MEMBERSHIP_FUNCTIONS[label][0] for label in INPUT_LABELS),
+    "rules": INPUT_RANGES,
+}
+# Jumlah contoh input tanpa rule aktif yang disimpan di laporan
+ZERO_EXAMPLES = 20
+# Selisih AQI maksimum yang diterima antara tabel asli dan tabel dipangkas
+PRUNED_TOLERANCE = 1e-9
+
+
+class RuleProfiler:
+    """
+    Mengumpulkan statistik penyalaan rule dari banyak pembacaan:
+
+    - ``fired``: berapa kali kekuatan rule > 0, beserta kekuatan rata-rata
+      saat menyala dan maksimumnya
+    - ``decisive``: berapa kali rule menjadi rule terkuat (kekuatan > 0) untuk
+      term output-nya; bila beberapa rule sama kuat, hanya yang pertama
+      (argmax) yang dihitung. Setiap baris menyisakan satu rule penentu per
+      term output, jadi rule yang tidak pernah menentukan bisa dipangkas
+      tanpa mengubah AQI pada data tersebut (lihat compare_pruned).
+    - pembacaan tanpa rule aktif (AQI NaN), beserta variabel penyebabnya:
+      variabel yang tidak satu pun term-nya (yang dipakai rule) aktif
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        rules = engine.rules
+        self.rules = rules
+        n_rules, n_vars = rules.antecedents.shape
+        self.rows = 0
+        self.fired = np.zeros(n_rules, dtype=np.int64)
+        self.decisive = np.zeros(n_rules, dtype=np.int64)
+        self.strength_sum = np.zeros(n_rules)
+        self.strength_max = np.zeros(n_rules)
+        self.zero_rows = 0
+        self.blocked_by = np.zeros(n_vars, dtype=np.int64)
+        self.zero_examples = []
+
+        # Term yang dipakai paling sedikit satu rule, per variabel
+        self._used_terms = np.zeros((n_vars, rules.max_terms), dtype=bool)
+        for var in range(n_vars):
+            column = rules.antecedents[:, var]
+            if (column == UNUSED).any():
+                self._used_terms[var] = True
+            else:
+                self._used_terms[var, np.unique(column)] = True
+
+    def add(self, inputs):
+        """Profilkan satu blok pembacaan (n, 6); baris dengan input kosong dilewati"""
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=np.float64))
+        inputs = inputs[np.isfinite(inputs).all(axis=1)]
+        for start in range(0, inputs.shape[0], self.engine.block_size):
+            self._add_block(inputs[start : start + self.engine.block_size])
+        return self
+
+    def _add_block(self, block):
+        memberships = self.engine.fuzzify(block)
+        strengths = self.rules.rule_strengths(memberships)
+        self.rows += block.shape[0]
+
+        active = strengths > 0
+        self.fired += active.sum(axis=0)
+        self.strength_sum += strengths.sum(axis=0)
+        np.maximum(self.strength_max, strengths.max(axis=0), out=self.strength_max)
+
+        # Rule terkuat dengan konsekuen yang sama menentukan potongan term
+        # output; bila seri, argmax memilih satu sehingga rule itu tetap ada
+        for output in np.unique(self.rules.consequents):
+            group = np.flatnonzero(self.rules.consequents == output)
+            values = strengths[:, group]
+            winner = values.argmax(axis=1)
+            fired = values[np.arange(values.shape[0]), winner] > 0
+            np.add.at(self.decisive, group[winner[fired]], 1)
+
+        zero = ~active.any(axis=1)
+        if zero.any():
+            self.zero_rows += int(zero.sum())
+            # Variabel tanpa satu pun term terpakai yang aktif mematikan semua rule
+            used_active = ((memberships[zero] > 0) & self._used_terms).any(axis=2)
+            self.blocked_by += (~used_active).sum(axis=0)
+            room = ZERO_EXAMPLES - len(self.zero_examples)
+            if room > 0:
+                self.zero_examples.extend(block[zero][:room].tolist())
+
+    def _rule_text(self, rule):
+        terms = [
+            f"{label}={labels[t]}"
+            for label, labels, t in zip(self.rules.variable_labels, self.rules.term_labels, self.rules.antecedents[rule])
+            if t != UNUSED
+        ]
+        return " & ".join(terms) + f" -> AQI={self.rules.output_terms[self.rules.consequents[rule]]}"
+
+    def prunable(self):
+        """Indeks rule yang tidak pernah menyala atau tidak pernah menentukan hasil"""
+        return np.flatnonzero(self.decisive == 0)
+
+    def pruned_rules(self):
+        """CompiledRules tanpa rule dari ``prunable()``"""
+        keep = self.decisive > 0
+        rules = self.rules
+        return CompiledRules(
+            rules.antecedents[keep], rules.consequents[keep], rules.variable_labels, rules.term_labels, rules.output_terms
+        )
+
+    def report(self, top=10):
+        """Laporan profil sebagai dict (siap disimpan ke JSON)"""
+        n_rules = len(self.fired)
+        mean_when_fired = np.divide(
+            self.strength_sum, self.fired, out=np.zeros(n_rules), where=self.fired > 0
+        )
+        dead = np.flatnonzero(self.fired == 0)
+        redundant = np.flatnonzero((self.fired > 0) & (self.decisive == 0))
+        order = np.argsort(-self.fired, kind="stable")
+
+        def describe(rule):
+            return {
+                "rule": int(rule),
+                "text": self._rule_text(rule),
+                "fired": int(self.fired[rule]),
+                "decisive": int(self.decisive[rule]),
+                "mean_strength_when_fired": float(mean_when_fired[rule]),
+                "max_strength": float(self.strength_max[rule]),
+            }
+
+        per_output = {}
+        for output, label in enumerate(self.rules.output_terms):
+            group = self.rules.consequents == output
+            per_output[label] = {"rules": int(group.sum()), "fired": int(self.fired[group].sum())}
+
+        return {
+            "rows": self.rows,
+            "rules": n_rules,
+            "zero_activation": {
+                "rows": self.zero_rows,
+                "fraction": self.zero_rows / self.rows if self.rows else 0.0,
+                "blocked_by": dict(zip(self.rules.variable_labels, self.blocked_by.tolist())),
+                "examples": [dict(zip(INPUT_LABELS, row)) for row in self.zero_examples],
+            },
+            "dead_rules": [describe(rule) for rule in dead],
+            "never_decisive_rules": [describe(rule) for rule in redundant],
+            "prunable_rules": int(self.prunable().size),
+            "per_output_term": per_output,
+            "most_fired": [describe(rule) for rule in order[:top]],
+            "rules_detail": [describe(rule) for rule in range(n_rules)],
+        }
+
+
+def compare_pruned(engine, pruned, blocks):
+    """
+    Bandingkan AQI dari ``engine`` dengan AQI dari tabel rule ``pruned`` pada
+    blok-blok pembacaan ``blocks``; tabel hasil pruned_rules() harus sama
+    pada data yang diprofilkan.
+    """
+    from batch_engine import BatchAQIEngine
+
+    pruned_engine = BatchAQIEngine.from_arrays(
+        engine.labels,
+        engine.universes,
+        engine.term_labels,
+        engine.term_mfs,
+        engine.output_universe,
+        engine.output_terms,
+        engine.output_mfs,
+        pruned,
+        block_size=engine.block_size,
+    )
+    rows = nan_mismatch = 0
+    max_diff = 0.0
+    for block in blocks:
+        expected, values = engine.compute(block), pruned_engine.compute(block)
+        both = ~np.isnan(expected) & ~np.isnan(values)
+        rows += block.shape[0]
+        nan_mismatch += int((np.isnan(expected) != np.isnan(values)).sum())
+        if both.any():
+            max_diff = max(max_diff, float(np.abs(expected[both] - values[both]).max()))
+    return {"rows": rows, "max_abs_diff": max_diff, "nan_mismatch": nan_mismatch}
+
+
+def sample_inputs(n, region="domain", seed=0):
+    """Pembacaan acak seragam di wilayah ``region`` (lihat REGIONS)"""
+    bounds = np.array(REGIONS[region], dtype=np.float64)
+    return np.random.default_rng(seed).random((n, len(INPUT_LABELS))) * bounds
+
+
+def format_report(report):
+    """Ringkasan laporan yang mudah dibaca"""
+    zero = report["zero_activation"]
+    lines = [
+        f"{report['rows']:,} pembacaan, {report['rules']} rule",
+        f"Tanpa rule aktif: {zero['rows']:,} ({zero['fraction']:.1%})",
+        "  Variabel penyebab: "
+        + ", ".join(f"{label} {count:,}" for label, count in zero["blocked_by"].items() if count),
+        f"Rule tidak pernah menyala: {len(report['dead_rules'])}",
+        f"Rule menyala tetapi tidak pernah menentukan hasil: {len(report['never_decisive_rules'])}",
+        f"Dapat dipangkas tanpa mengubah hasil pada data ini: {report['prunable_rules']}",
+        "Per term output (jumlah rule / total penyalaan):",
+    ]
+    for label, stats in report["per_output_term"].items():
+        lines.append(f"  {label:12s} {stats['rules']:4d} rule {stats['fired']:12,d}")
+    lines.append("Rule paling sering menyala:")
+    for rule in report["most_fired"]:
+        lines.append(f"  #{rule['rule']:<4d} {rule['fired']:10,d}x  {rule['text']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profil penyalaan rule sistem fuzzy AQI")
+    parser.add_argument("--data", help="File pembacaan (.csv/.parquet); default sampel acak")
+    parser.add_argument("--column", action="append", metavar="LABEL=KOLOM", help="Nama kolom input (boleh diulang)")
+    parser.add_argument("--samples", type=int, default=200_000, help="Jumlah sampel acak")
+    parser.add_argument("--region", choices=sorted(REGIONS), default="domain", help="Wilayah sampel acak")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="Jumlah rule teratas di ringkasan")
+    parser.add_argument("--output", help="Simpan laporan lengkap (JSON) ke file ini")
+    parser.add_argument("--pruned", help="Tulis tabel rule tanpa rule yang dapat dipangkas (CSV) ke file ini")
+    args = parser.parse_args(argv)
+
+    def blocks():
+        if args.data:
+            from score import _parse_columns, iter_chunks
+
+            columns = _parse_columns(args.column)
+            for chunk in iter_chunks(args.data, 100_000):
+                yield chunk[[columns[label] for label in INPUT_LABELS]].to_numpy(dtype="float64")
+        else:
+            yield sample_inputs(args.samples, args.region, args.seed)
+
+    engine = create_batch_engine()
+    profiler = RuleProfiler(engine)
+    for block in blocks():
+        profiler.add(block)
+
+    report = profiler.report(top=args.top)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan lengkap ditulis ke {args.output}", file=sys.stderr)
+    if args.pruned:
+        from rule_table import write_rule_table
+
+        pruned = profiler.pruned_rules()
+        # Data dibaca ulang untuk memastikan tabel yang dipangkas memberi AQI yang sama
+        check = compare_pruned(engine, pruned, blocks())
+        print(
+            f"Cek tabel dipangkas: {check['rows']:,} pembacaan, selisih maks {check['max_abs_diff']:.2e}, "
+            f"NaN berbeda {check['nan_mismatch']}",
+            file=sys.stderr,
+        )
+        if check["nan_mismatch"] or check["max_abs_diff"] > PRUNED_TOLERANCE:
+            sys.exit("Tabel rule yang dipangkas mengubah AQI; tidak ditulis")
+        write_rule_table(args.pruned, pruned)
+        print(f"{len(pruned)} rule ditulis ke {args.pruned}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
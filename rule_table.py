@@ -0,0 +1,178 @@
+import argparse
+import csv
+import importlib
+import os
+import sys
+import time
+
+import numpy as np
+
+from rule_compiler import UNUSED, CompiledRules, compile_rules
+from variables import INPUT_LABELS, MEMBERSHIP_FUNCTIONS, OUTPUT_LABEL
+
+# File tabel rule bawaan, dibuat dari rules.create_rules dengan perintah
+# ``python rule_table.py export``
+RULE_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.csv")
+
+
+def _term_labels(label):
+    return [term for term, _, _ in MEMBERSHIP_FUNCTIONS[label][1]]
+
+
+def write_rule_table(path, compiled):
+    """
+    Tulis CompiledRules sebagai CSV: satu baris per rule, satu kolom per
+    variabel berisi nama term (kosong bila variabel tidak dipakai), dan
+    kolom AQI berisi term output.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(list(compiled.variable_labels) + [OUTPUT_LABEL])
+        for terms, output in zip(compiled.antecedents, compiled.consequents):
+            row = ["" if t == UNUSED else labels[t] for t, labels in zip(terms, compiled.term_labels)]
+            writer.writerow(row + [compiled.output_terms[output]])
+
+
+def load_rule_table(path=RULE_TABLE):
+    """
+    Baca tabel rule CSV langsung menjadi CompiledRules (GridRules untuk tabel
+    6^6 lengkap, lihat CompiledRules.from_table), tanpa membangun objek term
+    scikit-fuzzy. Nama term diambil dari MEMBERSHIP_FUNCTIONS. Isi rules.csv
+    tidak diperiksa terhadap rules.py di sini; lihat check_rule_table.
+    """
+    term_labels = [_term_labels(label) for label in INPUT_LABELS]
+    output_terms = _term_labels(OUTPUT_LABEL)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if header != list(INPUT_LABELS) + [OUTPUT_LABEL]:
+            raise ValueError(f"Header tabel rule tidak sesuai: {', '.join(header)}")
+        lookups = [{term: i for i, term in enumerate(labels)} for labels in term_labels]
+        antecedents, consequents = [], []
+        for line, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            try:
+                antecedents.append(
+                    [lookup[term] if term else UNUSED for lookup, term in zip(lookups, row[:-1])]
+                )
+                consequents.append(output_terms.index(row[-1]))
+            except (KeyError, ValueError):
+                raise ValueError(f"Term tidak dikenal pada baris {line} tabel rule: {row}")
+    return CompiledRules.from_table(
+        np.array(antecedents, dtype=np.int8).reshape(-1, len(INPUT_LABELS)),
+        consequents,
+        INPUT_LABELS,
+        term_labels,
+        output_terms,
+    )
+
+
+def build_rules(compiled, antecedents, consequent):
+    """Bangun kembali daftar ctrl.Rule dari CompiledRules (untuk jalur scikit-fuzzy)"""
+    # Diimpor di sini agar load_rule_table tidak ikut memuat scikit-fuzzy
+    from skfuzzy import control as ctrl
+
+    compiled.check_variables(antecedents, consequent)
+    rules = []
+    for terms, output in zip(compiled.antecedents, compiled.consequents):
+        antecedent = None
+        for var, labels, t in zip(antecedents, compiled.term_labels, terms):
+            if t == UNUSED:
+                continue
+            term = var[labels[t]]
+            antecedent = term if antecedent is None else antecedent & term
+        rules.append(ctrl.Rule(antecedent, consequent[compiled.output_terms[output]]))
+    return rules
+
+
+def export_rules(path=RULE_TABLE):
+    """Ubah rules.create_rules menjadi tabel CSV dan pastikan hasilnya identik saat dibaca"""
+    from rules import create_rules
+    from variables import create_variables
+
+    variables = create_variables()
+    compiled = compile_rules(create_rules(*variables), variables[:6], variables[6])
+    write_rule_table(path, compiled)
+
+    loaded = load_rule_table(path)
+    rebuilt = compile_rules(build_rules(loaded, variables[:6], variables[6]), variables[:6], variables[6])
+    for table in (loaded, rebuilt):
+        if not (
+            np.array_equal(table.antecedents, compiled.antecedents)
+            and np.array_equal(table.consequents, compiled.consequents)
+        ):
+            raise AssertionError("Tabel rule tidak kembali sama setelah dibaca ulang")
+    return len(compiled)
+
+
+def check_rule_table(path=RULE_TABLE):
+    """
+    Pastikan tabel CSV masih sama dengan rules.create_rules. rules.csv adalah
+    salinan rules.py; setelah rules.py diubah jalankan ``python rule_table.py
+    export``. Memerlukan scikit-fuzzy.
+    """
+    from rules import create_rules
+    from variables import create_variables
+
+    variables = create_variables()
+    expected = compile_rules(create_rules(*variables), variables[:6], variables[6])
+    loaded = load_rule_table(path)
+    return np.array_equal(loaded.antecedents, expected.antecedents) and np.array_equal(
+        loaded.consequents, expected.consequents
+    )
+
+
+def measure_load_time(path=RULE_TABLE, repeat=5):
+    """
+    Bandingkan waktu memuat rule: impor rules.py + create_rules + kompilasi
+    lawan membaca tabel CSV. Impor rules.py hanya bisa diukur sekali per proses.
+    """
+    from variables import create_variables
+
+    variables = create_variables()
+    start = time.perf_counter()
+    rules_module = importlib.import_module("rules")
+    t_import = time.perf_counter() - start
+
+    timings = {"import_rules_module": t_import}
+    for name, func in (
+        ("create_rules", lambda: rules_module.create_rules(*variables)),
+        (
+            "create_and_compile",
+            lambda: compile_rules(rules_module.create_rules(*variables), variables[:6], variables[6]),
+        ),
+        ("load_rule_table", lambda: load_rule_table(path)),
+        ("load_and_build_rules", lambda: build_rules(load_rule_table(path), variables[:6], variables[6])),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konversi dan pengukuran tabel rule AQI")
+    parser.add_argument("command", choices=("export", "check", "measure"))
+    parser.add_argument("--path", default=RULE_TABLE, help="File tabel rule CSV")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        n_rules = export_rules(args.path)
+        print(f"{n_rules} rule ditulis ke {args.path}")
+    elif args.command == "check":
+        if not check_rule_table(args.path):
+            sys.exit(f"{args.path} tidak sama dengan rules.py; jalankan: python rule_table.py export")
+        print(f"{args.path} sama dengan rules.py")
+    else:
+        if "rules" in sys.modules:
+            print("Catatan: rules.py sudah diimpor, waktu impor tidak terukur", file=sys.stderr)
+        for name, seconds in measure_load_time(args.path).items():
+            print(f"{name:24s} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from aqi_categories import categorize_array
+from batch_engine import create_batch_engine
+from parallel import ParallelScorer
+from response_surface import load_surface
+from variables import INPUT_LABELS
+
+# Tipe kolom hasil di Parquet; ditetapkan agar tidak ditebak dari potongan
+# pertama (misalnya Kategori yang semuanya kosong akan menjadi tipe null)
+OUTPUT_TYPES = {"AQI": "float64", "Kategori": "string"}
+
+
+def _file_format(path):
+    """Tentukan format file dari ekstensinya"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".gz", ".bz2", ".zip", ".xz"):
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Format file tidak dikenali: {path} (gunakan .csv atau .parquet)")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Membaca/menulis Parquet membutuhkan paket pyarrow (pip install pyarrow)")
+
+
+def iter_chunks(path, chunk_size):
+    """Baca file input per potongan DataFrame tanpa memuat seluruh file"""
+    if _file_format(path) == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+class ChunkWriter:
+    """
+    Menulis potongan hasil secara bertahap ke CSV atau Parquet. Skema Parquet
+    diambil dari potongan pertama, kecuali kolom di ``types`` ({nama: alias
+    tipe pyarrow}) yang tipenya ditetapkan; semua potongan ditulis dengan
+    skema tersebut.
+    """
+
+    def __init__(self, path, types=None):
+        self.path = path
+        self.format = _file_format(path)
+        self.types = types or {}
+        self._parquet_writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, frame):
+        if self.format == "csv":
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        else:
+            _require_pyarrow()
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._schema is None:
+                schema = pa.Schema.from_pandas(frame, preserve_index=False)
+                for name, alias in self.types.items():
+                    schema = schema.set(schema.get_field_index(name), pa.field(name, pa.type_for_alias(alias)))
+                self._schema = schema
+            table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+            self._parquet_writer.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_frame(frame, engine, columns=None):
+    """
+    Tambahkan kolom AQI dan Kategori pada satu potongan DataFrame. Kolom input
+    diubah ke float64 agar tipenya sama di semua potongan; baris dengan
+    pembacaan kosong atau tanpa rule aktif mendapat AQI NaN dan Kategori kosong.
+    """
+    columns = columns or dict(zip(INPUT_LABELS, INPUT_LABELS))
+    names = [columns[label] for label in INPUT_LABELS]
+    frame = frame.astype(dict.fromkeys(names, "float64"))
+    inputs = frame[names].to_numpy()
+    valid = ~np.isnan(inputs).any(axis=1)
+    values = np.full(len(frame), np.nan)
+    if valid.any():
+        values[valid] = engine.compute(inputs[valid])
+    _, category = categorize_array(values)
+    return frame.assign(AQI=values, Kategori=category)
+
+
+def score_file(input_path, output_path, engine, chunk_size=100_000, columns=None, progress=None):
+    """
+    Hitung AQI untuk seluruh file input per potongan dan tulis hasilnya
+    secara bertahap, sehingga memori tetap terbatas berapa pun ukuran file.
+    Mengembalikan jumlah baris yang diproses.
+    """
+    writer = ChunkWriter(output_path, OUTPUT_TYPES)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(input_path, chunk_size):
+            writer.write(score_frame(chunk, engine, columns))
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows, time.perf_counter() - start)
+    finally:
+        writer.close()
+    return rows
+
+
+def _print_progress(rows, elapsed):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"\r{rows:,} baris diproses ({rate:,.0f} baris/detik)", end="", file=sys.stderr, flush=True)
+
+
+def _parse_columns(pairs):
+    """Ubah argumen LABEL=kolom menjadi pemetaan label ke nama kolom"""
+    columns = dict(zip(INPUT_LABELS, INPUT_LABELS))
+    for pair in pairs or []:
+        label, _, name = pair.partition("=")
+        if label not in columns or not name:
+            raise ValueError(f"Pemetaan kolom tidak valid: {pair}")
+        columns[label] = name
+    return columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung AQI untuk file CSV/Parquet berukuran besar")
+    parser.add_argument("input", help="File input (.csv atau .parquet)")
+    parser.add_argument("output", help="File output (.csv atau .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Jumlah baris per potongan")
+    parser.add_argument(
+        "--column",
+        action="append",
+        metavar="LABEL=KOLOM",
+        help="Nama kolom input untuk parameter, misalnya PM2.5=pm25 (boleh diulang)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Pakai tabel keanggotaan dan centroid analitik (lebih cepat, selisih AQI < 0.05)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Jumlah proses paralel (0 = semua core)"
+    )
+    parser.add_argument(
+        "--surface",
+        metavar="DIR",
+        help="Jawab dari response surface hasil response_surface.py (jauh lebih cepat, tidak eksak)",
+    )
+    parser.add_argument(
+        "--surface-max-error",
+        type=float,
+        metavar="AQI",
+        help="Tolak response surface yang error maksimumnya (diukur saat dibangun) melebihi batas ini",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Jangan tampilkan progres")
+    args = parser.parse_args(argv)
+
+    engine_options = {"lookup_tables": True, "defuzzify_method": "analytic"} if args.fast else {}
+    if args.surface:
+        try:
+            engine = load_surface(args.surface, max_error=args.surface_max_error)
+        except ValueError as e:
+            sys.exit(str(e))
+        if engine.error is not None:
+            error = engine.error["rule_region"]
+            print(
+                f"Response surface: error AQI maks {error['max_error']:.1f}, p99 {error['p99_error']:.1f}, "
+                f"rata-rata {error['mean_error']:.2f} (terhadap mesin eksak)",
+                file=sys.stderr,
+            )
+        else:
+            print("Response surface: error belum diukur; bangun ulang dengan response_surface.py", file=sys.stderr)
+    elif args.workers == 1:
+        engine = create_batch_engine(**engine_options)
+    else:
+        engine = ParallelScorer(workers=args.workers or None, **engine_options)
+    start = time.perf_counter()
+    try:
+        rows = score_file(
+            args.input,
+            args.output,
+            engine,
+            chunk_size=args.chunk_size,
+            columns=_parse_columns(args.column),
+            progress=None if args.quiet else _print_progress,
+        )
+    finally:
+        if isinstance(engine, ParallelScorer):
+            engine.close()
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"\nSelesai: {rows:,} baris dalam {elapsed:.1f} detik ({rate:,.0f} baris/detik)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
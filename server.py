@@ -0,0 +1,149 @@
+import argparse
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from aqi_categories import category_color
+from aqi_service import create_aqi_service
+from instrumentation import INSTRUMENTATION
+from variables import INPUT_LABELS
+
+
+def _result(aqi_value):
+    """Bentuk respons untuk satu nilai AQI"""
+    if math.isnan(aqi_value):
+        return {"aqi": None, "category": None, "color": None, "error": "Tidak ada rule yang aktif"}
+    color, category = category_color(aqi_value)
+    return {"aqi": aqi_value, "category": category, "color": color}
+
+
+def _reading_row(reading):
+    """Ubah satu pembacaan JSON {label: nilai} menjadi baris input"""
+    if not isinstance(reading, dict):
+        raise ValueError("Setiap pembacaan harus berupa objek JSON")
+    missing = [label for label in INPUT_LABELS if label not in reading]
+    if missing:
+        raise ValueError(f"Parameter tidak lengkap: {', '.join(missing)}")
+    row = [float(reading[label]) for label in INPUT_LABELS]
+    # float() menerima "NaN" dan "Infinity"; nilai seperti itu bukan pembacaan
+    invalid = [label for label, x in zip(INPUT_LABELS, row) if not math.isfinite(x)]
+    if invalid:
+        raise ValueError(f"Nilai parameter tidak valid: {', '.join(invalid)}")
+    return row
+
+
+class AQIRequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpoint penilaian AQI:
+
+    - ``POST /aqi`` dengan objek JSON satu pembacaan, atau array pembacaan
+    - ``POST /aqi/batch`` dengan array pembacaan (atau {"readings": [...]})
+    - ``GET /metrics`` (teks Prometheus) dan ``GET /metrics.json``: waktu per
+      tahap bila instrumentasi aktif (``--instrument`` atau AQI_INSTRUMENTATION=1)
+    """
+
+    # HTTP/1.1 agar koneksi keep-alive dipakai ulang oleh klien
+    protocol_version = "HTTP/1.1"
+    # Koneksi idle ditutup setelah sekian detik agar worker tidak tertahan
+    timeout = 30
+    # Header dan body dikirim terpisah; tanpa ini delayed ACK menahan ~40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send(200, INSTRUMENTATION.prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif self.path == "/metrics.json":
+            self._send_json(200, INSTRUMENTATION.snapshot())
+        else:
+            self._send_json(404, {"error": "Endpoint tidak ditemukan"})
+
+    def do_POST(self):
+        # Body selalu dibaca agar koneksi keep-alive tetap sinkron
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path not in ("/aqi", "/aqi/batch"):
+            self._send_json(404, {"error": "Endpoint tidak ditemukan"})
+            return
+        with INSTRUMENTATION.request("http_request"):
+            self._handle_readings(body)
+
+    def _handle_readings(self, body):
+        try:
+            payload = json.loads(body or b"null")
+            if isinstance(payload, dict) and "readings" in payload:
+                payload = payload["readings"]
+
+            if isinstance(payload, list):
+                rows = np.array([_reading_row(reading) for reading in payload], dtype=np.float64)
+                values = self.server.evaluate_batch(rows.reshape(-1, len(INPUT_LABELS)))
+                self._send_json(200, {"results": [_result(float(v)) for v in values]})
+            elif self.path == "/aqi":
+                values = self.server.evaluate_batch(np.array([_reading_row(payload)]))
+                result = _result(float(values[0]))
+                self._send_json(422 if result["aqi"] is None else 200, result)
+            else:
+                raise ValueError("Endpoint batch membutuhkan array pembacaan")
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+
+    def _send_json(self, status, body):
+        self._send(status, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Log per request terlalu mahal pada ribuan request per detik
+        pass
+
+
+class AQIServer(ThreadingHTTPServer):
+    """
+    Setiap koneksi (termasuk keep-alive yang sedang idle) ditangani thread
+    sendiri, jadi koneksi baru tidak pernah menunggu koneksi lain ditutup.
+    Hanya perhitungan AQI yang dibatasi: paling banyak ``workers`` request
+    menghitung bersamaan.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service, workers=8):
+        super().__init__(address, AQIRequestHandler)
+        self.service = service
+        self.workers = workers
+        self._scoring = threading.BoundedSemaphore(workers)
+
+    def evaluate_batch(self, rows):
+        """service.evaluate_batch dengan batas jumlah perhitungan bersamaan"""
+        with self._scoring:
+            return self.service.evaluate_batch(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server HTTP/JSON untuk menghitung AQI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Jumlah perhitungan AQI bersamaan")
+    parser.add_argument("--instrument", action="store_true", help="Catat waktu per tahap untuk /metrics")
+    args = parser.parse_args()
+    if args.instrument:
+        INSTRUMENTATION.enabled = True
+
+    server = AQIServer((args.host, args.port), create_aqi_service(), workers=args.workers)
+    print(f"Server AQI berjalan di http://{args.host}:{args.port} ({args.workers} worker)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from aqi_categories import categorize_array
+from variables import INPUT_LABELS
+
+# Nama kolom yang dikenali untuk koordinat dan nama stasiun
+LATITUDE_COLUMNS = ("lat", "latitude", "lintang")
+LONGITUDE_COLUMNS = ("lon", "lng", "longitude", "bujur")
+STATION_COLUMNS = ("station", "stasiun", "name", "nama")
+# Warna stasiun tanpa rule aktif
+MISSING_COLOR = "#BDBDBD"
+
+
+def content_hash(data):
+    """Hash isi file, dipakai sebagai kunci cache hasil penilaian"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _find_column(frame, candidates, what):
+    lookup = {str(column).strip().lower(): column for column in frame.columns}
+    for name in candidates:
+        if name in lookup:
+            return lookup[name]
+    raise ValueError(f"Kolom {what} tidak ditemukan (gunakan salah satu: {', '.join(candidates)})")
+
+
+def read_stations(data, name):
+    """
+    Baca file stasiun (bytes CSV atau Parquet, format dari ekstensi ``name``)
+    menjadi DataFrame dengan kolom station, lat, lon, dan INPUT_LABELS.
+    Stasiun dengan koordinat kosong atau bukan angka dibuang.
+    """
+    ext = os.path.splitext(name)[1].lower()
+    if ext in (".parquet", ".pq"):
+        frame = pd.read_parquet(io.BytesIO(data))
+    else:
+        frame = pd.read_csv(io.BytesIO(data))
+
+    missing = [label for label in INPUT_LABELS if label not in frame.columns]
+    if missing:
+        raise ValueError(f"Kolom parameter tidak ditemukan: {', '.join(missing)}")
+    lat = _find_column(frame, LATITUDE_COLUMNS, "lintang")
+    lon = _find_column(frame, LONGITUDE_COLUMNS, "bujur")
+    try:
+        station = frame[_find_column(frame, STATION_COLUMNS, "stasiun")].astype(str)
+    except ValueError:
+        station = pd.Series([f"Stasiun {i + 1}" for i in range(len(frame))], index=frame.index)
+
+    stations = pd.DataFrame(
+        {
+            "station": station,
+            "lat": pd.to_numeric(frame[lat], errors="coerce"),
+            "lon": pd.to_numeric(frame[lon], errors="coerce"),
+        }
+    )
+    for label in INPUT_LABELS:
+        stations[label] = pd.to_numeric(frame[label], errors="coerce")
+    # st.map tidak bisa menggambar koordinat yang tidak valid
+    located = stations["lat"].between(-90, 90) & stations["lon"].between(-180, 180)
+    return stations[located].reset_index(drop=True)
+
+
+def score_stations(service, stations):
+    """
+    Nilai semua stasiun dalam satu panggilan ``evaluate_batch`` dan tambahkan
+    kolom AQI, Kategori, dan color. Stasiun dengan pembacaan kosong atau tanpa
+    rule aktif mendapat AQI NaN dan warna MISSING_COLOR.
+    """
+    stations = stations.copy()
+    inputs = stations[list(INPUT_LABELS)].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(inputs).any(axis=1)
+    values = np.full(len(stations), np.nan)
+    if valid.any():
+        values[valid] = service.evaluate_batch(inputs[valid])
+    colors, categories = categorize_array(values)
+    stations["AQI"] = values
+    stations["Kategori"] = np.where(categories == None, "Tidak dapat dihitung", categories)  # noqa: E711
+    stations["color"] = np.where(colors == None, MISSING_COLOR, colors)  # noqa: E711
+    return stations
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+
+class StreamingScorer:
+    """
+    Penghitung AQI bertahap untuk satu aliran pembacaan sensor.
+
+    Keanggotaan tiap variabel dan kekuatan tiap rule dari tick sebelumnya
+    disimpan. Saat sebuah input berubah, hanya fuzzifikasi variabel itu dan
+    rule yang memakainya yang dihitung ulang; bila kekuatan term output tidak
+    berubah, AQI sebelumnya dipakai lagi tanpa defuzzifikasi.
+
+    Fuzzifikasi selalu memakai interpolasi (bukan MembershipTables), jadi
+    hasilnya sama dengan ``engine.compute`` pada mesin tanpa lookup_tables.
+    Perubahan input yang tidak lebih dari ``tolerance`` dianggap tidak ada.
+    """
+
+    def __init__(self, engine, tolerance=0.0):
+        self.engine = engine
+        self.tolerance = tolerance
+        self.labels = engine.labels
+        rules = engine.rules
+        self._rules = rules
+        self._max_terms = rules.max_terms
+        self._rules_using = [rules.rules_using(var) for var in range(len(self.labels))]
+        self.reset()
+
+    def reset(self):
+        """Lupakan pembacaan sebelumnya"""
+        n_vars = len(self.labels)
+        self.inputs = np.full(n_vars, np.nan)
+        self._flat = np.ones(n_vars * self._max_terms + 1)
+        self._flat[:-1] = 0.0
+        self._strengths = np.zeros(len(self._rules))
+        self._cuts = None
+        self.value = math.nan
+        self.stats = {"ticks": 0, "variables_updated": 0, "rules_fired": 0, "defuzzified": 0}
+
+    def _fuzzify(self, var, x):
+        universe, mfs = self.engine.universes[var], self.engine.term_mfs[var]
+        x = min(max(x, universe[0]), universe[-1])
+        start = var * self._max_terms
+        for j, mf in enumerate(mfs):
+            self._flat[start + j] = np.interp(x, universe, mf, left=0.0, right=0.0)
+
+    def update(self, reading):
+        """
+        Terapkan satu pembacaan dan kembalikan AQI terbaru (NaN bila tidak ada
+        rule aktif atau input belum lengkap). ``reading`` berupa dict
+        {label: nilai}, boleh hanya berisi parameter yang berubah, atau urutan
+        enam nilai sesuai label mesin.
+        """
+        if not isinstance(reading, dict):
+            reading = dict(zip(self.labels, reading))
+        self.stats["ticks"] += 1
+
+        changed = []
+        for var, label in enumerate(self.labels):
+            if label not in reading or reading[label] is None:
+                continue
+            x = float(reading[label])
+            if not math.isfinite(x):
+                raise ValueError(f"Nilai {label} tidak valid")
+            old = self.inputs[var]
+            if math.isnan(old) or abs(x - old) > self.tolerance:
+                self.inputs[var] = x
+                self._fuzzify(var, x)
+                changed.append(var)
+        if not changed or np.isnan(self.inputs).any():
+            return self.value
+
+        if self._cuts is None:
+            # Tick lengkap pertama: rule yang tidak memakai variabel yang baru
+            # berubah belum pernah dihitung, jadi semua rule dinyalakan
+            affected = np.arange(len(self._rules))
+        elif len(changed) == 1:
+            affected = self._rules_using[changed[0]]
+        else:
+            affected = np.unique(np.concatenate([self._rules_using[var] for var in changed]))
+        self._strengths[affected] = self._rules.strengths(self._flat, affected)
+        self.stats["variables_updated"] += len(changed)
+        self.stats["rules_fired"] += affected.size
+
+        cuts = self._rules.aggregate(self._strengths)
+        if self._cuts is None or not np.array_equal(cuts, self._cuts):
+            self._cuts = cuts
+            self.value = float(self.engine.defuzzify_cuts(cuts[None, :])[0])
+            self.stats["defuzzified"] += 1
+        return self.value
+
+    async def stream(self, readings):
+        """
+        Async generator: konsumsi pembacaan dari iterable biasa atau async
+        iterable, dan hasilkan dict berisi input lengkap terkini beserta AQI.
+        """
+        if hasattr(readings, "__aiter__"):
+            async for reading in readings:
+                yield self._result(self.update(reading))
+        else:
+            for reading in readings:
+                yield self._result(self.update(reading))
+
+    def _result(self, value):
+        result = dict(zip(self.labels, self.inputs.tolist()))
+        result["AQI"] = value
+        return result
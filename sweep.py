@@ -0,0 +1,96 @@
+import numpy as np
+
+from rule_compiler import UNUSED
+
+
+def sweep_axis(engine, label, points=200, lower=None, upper=None):
+    """Titik sapuan satu input, default seluruh universe-nya"""
+    universe = engine.universes[engine.labels.index(label)]
+    lower = universe[0] if lower is None else lower
+    upper = universe[-1] if upper is None else upper
+    return np.linspace(lower, upper, points)
+
+
+def _memberships(engine, var, x):
+    """Derajat keanggotaan tiap term variabel ``var`` di titik ``x`` (n, max_term)"""
+    universe, mfs = engine.universes[var], engine.term_mfs[var]
+    x = np.clip(np.asarray(x, dtype=np.float64), universe[0], universe[-1])
+    out = np.zeros((x.size, engine.rules.max_terms))
+    for j, mf in enumerate(mfs):
+        out[:, j] = np.interp(x, universe, mf, left=0.0, right=0.0)
+    return out
+
+
+def sweep(engine, base, axes):
+    """
+    AQI saat satu atau dua input disapu dan input lain tetap pada ``base``.
+
+    ``base`` berupa dict {label: nilai} atau urutan enam nilai sesuai label
+    mesin, ``axes`` dict {label: titik} berisi satu atau dua input. Hasilnya
+    array AQI berbentuk (len(titik1),) atau (len(titik1), len(titik2)),
+    NaN bila tidak ada rule aktif.
+
+    Semua titik dihitung sekaligus tanpa membangun array input penuh:
+    bagian kekuatan rule dari input tetap dihitung sekali, rule yang mati
+    karenanya dibuang, lalu sisanya dinyalakan untuk tiap kombinasi titik.
+    Kombinasi dengan kekuatan term output yang sama (misalnya di dataran
+    fungsi keanggotaan) hanya didefuzzifikasi sekali. Kekuatan rule dan
+    defuzzifikasi diproses per ``engine.block_size`` titik sehingga memori
+    tetap terbatas untuk grid besar. Hasilnya sama dengan ``engine.compute``
+    pada semua titik grid.
+    """
+    rules = engine.rules
+    labels = list(engine.labels)
+    if not isinstance(base, dict):
+        base = dict(zip(labels, base))
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("Sapuan hanya untuk satu atau dua input")
+
+    swept = [labels.index(label) for label in axes]
+    points = [np.asarray(values, dtype=np.float64) for values in axes.values()]
+
+    # Kekuatan rule dari input tetap saja (input yang disapu dianggap 1)
+    memberships = np.zeros((1, len(labels), rules.max_terms))
+    for var in range(len(labels)):
+        if var in swept:
+            memberships[0, var] = 1.0
+        else:
+            memberships[0, var] = _memberships(engine, var, float(base[labels[var]]))[0]
+    fixed_strength = rules.rule_strengths(memberships)[0]
+    active = np.flatnonzero(fixed_strength > 0)
+
+    shape = tuple(p.size for p in points)
+    n_out = len(rules.output_terms)
+    consequents = rules.consequents[active]
+    outputs = np.unique(consequents)
+    degrees = []
+    for var, values in zip(swept, points):
+        terms = rules.antecedents[active, var]
+        degree = _memberships(engine, var, values)[:, np.where(terms == UNUSED, 0, terms)]
+        degree[:, terms == UNUSED] = 1.0
+        degrees.append(degree)
+
+    # Kekuatan rule berukuran (titik, rule), jadi grid dihitung per potongan
+    # sumbu pertama sebanyak kira-kira engine.block_size titik
+    cuts = np.zeros(shape + (n_out,))
+    inner = int(np.prod(shape[1:]))
+    step = max(1, engine.block_size // inner)
+    for start in range(0, shape[0], step):
+        stop = min(start + step, shape[0])
+        strengths = np.minimum(fixed_strength[active], degrees[0][start:stop])
+        if len(degrees) == 2:
+            # Sumbu pertama, sumbu kedua, lalu rule pada sumbu terakhir
+            strengths = np.minimum(strengths[:, None, :], degrees[1][None, :, :])
+        for k in outputs:
+            cuts[start:stop, ..., k] = strengths[..., consequents == k].max(axis=-1)
+
+    cuts = cuts.reshape(-1, n_out)
+    result = np.full(cuts.shape[0], np.nan)
+    fired = np.flatnonzero(cuts.any(axis=1))
+    if fired.size:
+        unique, inverse = np.unique(cuts[fired], axis=0, return_inverse=True)
+        values = np.empty(unique.shape[0])
+        for start in range(0, unique.shape[0], engine.block_size):
+            values[start : start + engine.block_size] = engine.defuzzify_cuts(unique[start : start + engine.block_size])
+        result[fired] = values[inverse.reshape(-1)]
+    return result.reshape(shape)
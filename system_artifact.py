@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from batch_engine import BatchAQIEngine, create_batch_engine
+from rule_compiler import CompiledRules
+
+# Naikkan bila susunan file artefak berubah
+ARTIFACT_FORMAT = 1
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Sumber sistem fuzzy; isi file-file ini menentukan hash versi artefak
+SOURCE_FILES = ("variables.py", "rules.py")
+DEFAULT_ARTIFACT = os.environ.get("AQI_SYSTEM_ARTIFACT", os.path.join(BASE_DIR, "build", "aqi_system"))
+# Opsi yang memengaruhi isi array; opsi lain hanya dipakai saat memuat
+BUILD_OPTIONS = ("resolution",)
+
+
+def version_hash(resolution=None):
+    """Hash isi fungsi keanggotaan, rule, dan resolusi universe"""
+    digest = hashlib.sha256(f"format={ARTIFACT_FORMAT};".encode())
+    for path in SOURCE_FILES:
+        with open(os.path.join(BASE_DIR, path), "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(resolution, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def save_artifact(engine, path=DEFAULT_ARTIFACT, resolution=None):
+    """
+    Simpan array mesin ke direktori ``path``: satu file .npy per array dan
+    meta.json berisi label, term, dan hash versi. Ditulis ke direktori
+    sementara lalu menggantikan direktori lama, jadi tidak ada artefak yang
+    setengah jadi. Penggantian ini dua langkah (hapus lalu rename); replika
+    yang sedang memuat di antaranya mendapat None dari load_artifact dan
+    membangun mesin sendiri.
+    """
+    arrays = {
+        "output_universe": engine.output_universe,
+        "output_mfs": engine.output_mfs,
+        "antecedents": engine.rules.antecedents,
+        "consequents": engine.rules.consequents,
+    }
+    for i, (universe, mfs) in enumerate(zip(engine.universes, engine.term_mfs)):
+        arrays[f"universe_{i}"] = universe
+        arrays[f"term_mfs_{i}"] = mfs
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "version": version_hash(resolution),
+        "labels": list(engine.labels),
+        "term_labels": engine.term_labels,
+        "output_terms": engine.output_terms,
+    }
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".aqi_system-", dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _read_meta(path):
+    """Isi meta.json artefak (None bila tidak ada atau tidak terbaca)"""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_artifact(path=DEFAULT_ARTIFACT, resolution=None, **engine_options):
+    """
+    Muat mesin dari artefak dengan memory-map (tidak ada fungsi keanggotaan
+    atau rule yang dibangun ulang, dan scikit-fuzzy tidak diimpor).
+    Mengembalikan None bila artefak tidak ada atau versinya sudah usang.
+    """
+    meta = _read_meta(path)
+    if meta is None or meta.get("format") != ARTIFACT_FORMAT or meta.get("version") != version_hash(resolution):
+        return None
+
+    def _load(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    n_vars = len(meta["labels"])
+    try:
+        arrays = {name: _load(name) for name in ("antecedents", "consequents", "output_universe", "output_mfs")}
+        universes = [_load(f"universe_{i}") for i in range(n_vars)]
+        term_mfs = [_load(f"term_mfs_{i}") for i in range(n_vars)]
+    except (OSError, ValueError):
+        # Artefak sedang diganti oleh proses lain (lihat save_artifact)
+        return None
+    # Array dari artefak pengganti tidak boleh dipasangkan dengan meta lama
+    if _read_meta(path) != meta:
+        return None
+
+    rules = CompiledRules(
+        arrays["antecedents"], arrays["consequents"], meta["labels"], meta["term_labels"], meta["output_terms"]
+    )
+    return BatchAQIEngine.from_arrays(
+        meta["labels"],
+        universes,
+        meta["term_labels"],
+        term_mfs,
+        arrays["output_universe"],
+        meta["output_terms"],
+        arrays["output_mfs"],
+        rules,
+        **engine_options,
+    )
+
+
+def load_or_build_engine(path=DEFAULT_ARTIFACT, **engine_options):
+    """
+    Muat artefak bila masih berlaku; bila tidak, bangun mesin seperti biasa
+    dan simpan artefak baru (diabaikan bila direktori tidak bisa ditulis).
+    """
+    build_options = {name: engine_options.pop(name) for name in BUILD_OPTIONS if name in engine_options}
+    engine = load_artifact(path, **build_options, **engine_options)
+    if engine is not None:
+        return engine
+
+    engine = create_batch_engine(**build_options, **engine_options)
+    try:
+        save_artifact(engine, path, **build_options)
+    except OSError as e:
+        print(f"Artefak sistem fuzzy tidak bisa disimpan ke {path}: {e}", file=sys.stderr)
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun artefak sistem fuzzy AQI untuk start cepat")
+    parser.add_argument("--path", default=DEFAULT_ARTIFACT, help="Direktori artefak")
+    parser.add_argument(
+        "--resolution",
+        choices=("grid", "breakpoints", "input-breakpoints"),
+        default="input-breakpoints",
+        help="Resolusi universe (lihat variables.make_universe)",
+    )
+    args = parser.parse_args(argv)
+
+    from variables import INPUT_BREAKPOINTS
+
+    resolution = {"grid": None, "breakpoints": "breakpoints", "input-breakpoints": INPUT_BREAKPOINTS}
+    resolution = resolution[args.resolution]
+    start = time.perf_counter()
+    engine = create_batch_engine(resolution=resolution)
+    t_build = time.perf_counter() - start
+    save_artifact(engine, args.path, resolution=resolution)
+
+    start = time.perf_counter()
+    load_artifact(args.path, resolution=resolution)
+    t_load = time.perf_counter() - start
+    print(f"Artefak {version_hash(resolution)} disimpan di {args.path}")
+    print(f"Bangun dari sumber: {t_build * 1000:.1f} ms, muat artefak: {t_load * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+
+# Urutan input yang dipakai di seluruh aplikasi (kalkulator, batch, dsb.)
+INPUT_LABELS = ("PM2.5", "PM10", "CO", "NO2", "O3", "SO2")
+OUTPUT_LABEL = "AQI"
+# Universe input hanya di titik sudut: hasil identik dengan grid 1 satuan
+INPUT_BREAKPOINTS = {label: "breakpoints" for label in INPUT_LABELS}
+
+# Definisi fungsi keanggotaan (membership functions):
+# label -> (batas atas universe, [(term, nama fungsi skfuzzy, parameter), ...]).
+# Fungsi disimpan sebagai nama agar modul ini bisa diimpor tanpa scikit-fuzzy.
+MEMBERSHIP_FUNCTIONS = {
+    "PM2.5": (
+        445,
+        [
+            ("baik", "trapmf", [0, 0, 15, 45]),
+            ("sedang", "trimf", [15, 45, 75]),
+            ("buruk", "trimf", [45, 75, 105]),
+            ("tidak_sehat", "trimf", [75, 105, 135]),
+            ("parah", "trimf", [105, 185, 265]),
+            ("berbahaya", "trapmf", [185, 315, 445, 445]),
+        ],
+    ),
+    "PM10": (
+        550,
+        [
+            ("baik", "trapmf", [0, 0, 25, 75]),
+            ("sedang", "trimf", [25, 75, 125]),
+            ("buruk", "trimf", [75, 175, 275]),
+            ("tidak_sehat", "trimf", [210, 300, 390]),
+            ("parah", "trimf", [310, 390, 470]),
+            ("berbahaya", "trapmf", [390, 470, 550, 550]),
+        ],
+    ),
+    "CO": (
+        54165,
+        [
+            ("baik", "trapmf", [0, 0, 4165, 12500]),
+            ("sedang", "trimf", [4165, 12500, 20835]),
+            ("buruk", "trimf", [12505, 20835, 29165]),
+            ("tidak_sehat", "trimf", [20835, 29165, 37495]),
+            ("parah", "trimf", [29165, 37500, 45835]),
+            ("berbahaya", "trapmf", [37505, 45835, 54165, 54165]),
+        ],
+    ),
+    "NO2": (
+        550,
+        [
+            ("baik", "trapmf", [0, 0, 20, 60]),
+            ("sedang", "trimf", [20, 60, 100]),
+            ("buruk", "trimf", [75, 130, 185]),
+            ("tidak_sehat", "trimf", [130, 185, 240]),
+            ("parah", "trimf", [185, 295, 405]),
+            ("berbahaya", "trapmf", [350, 450, 550, 550]),
+        ],
+    ),
+    "O3": (
+        1501,
+        [
+            ("baik", "trapmf", [0, 0, 25, 75]),
+            ("sedang", "trimf", [25, 75, 100]),
+            ("buruk", "trimf", [80, 134, 188]),
+            ("tidak_sehat", "trimf", [148, 188, 228]),
+            ("parah", "trimf", [188, 470, 752]),
+            ("berbahaya", "trapmf", [497, 999, 1501, 1501]),
+        ],
+    ),
+    "SO2": (
+        3000,
+        [
+            ("baik", "trapmf", [0, 0, 20, 60]),
+            ("sedang", "trimf", [20, 60, 100]),
+            ("buruk", "trimf", [60, 230, 400]),
+            ("tidak_sehat", "trimf", [230, 590, 950]),
+            ("parah", "trimf", [590, 1200, 1810]),
+            ("berbahaya", "trapmf", [1200, 2100, 3000, 3000]),
+        ],
+    ),
+    "AQI": (
+        550,
+        [
+            ("baik", "trapmf", [0, 0, 25, 75]),
+            ("sedang", "trimf", [25, 75, 125]),
+            ("buruk", "trimf", [75, 125, 175]),
+            ("tidak_sehat", "trimf", [125, 175, 225]),
+            ("parah", "trimf", [175, 225, 275]),
+            ("berbahaya", "trapmf", [225, 275, 325, 325]),
+        ],
+    ),
+}
+# Batas atas wilayah tempat rule-rule berada, per INPUT_LABELS (CO < 12500, dst.);
+# dipakai untuk sampel uji di benchmark, profiler, dan response surface
+INPUT_RANGES = (150, 250, 12500, 120, 200, 400)
+
+
+def make_universe(label, resolution=None):
+    """
+    Universe untuk sebuah variabel.
+
+    - ``None`` atau ``1``: grid bilangan bulat 0..batas atas (seperti semula)
+    - ``"breakpoints"``: hanya titik sudut fungsi keanggotaan beserta tetangga
+      ±1-nya. Interpolasi linear di universe ini sama persis dengan grid
+      bilangan bulat, tetapi jumlah titiknya puluhan, bukan puluhan ribu.
+    - bilangan bulat N > 1: N titik berjarak sama (akurasi berkurang bila
+      sudut fungsi keanggotaan tidak jatuh tepat di grid)
+
+    Hasil pengukuran (benchmark.bench_resolution) terhadap grid 1 satuan:
+    ``"breakpoints"`` pada input identik (selisih < 1e-9); pada AQI identik
+    untuk centroid analitik dan berselisih < 1.5 untuk centroid diskret,
+    karena centroid diskret bergantung pada titik-titik sampel universe.
+    N titik berjarak sama bisa berselisih > 10 dan mengubah baris yang aktif.
+    """
+    upper, terms = MEMBERSHIP_FUNCTIONS[label]
+    if resolution is None or resolution == 1:
+        return np.arange(0, upper + 1, 1)
+    if resolution == "breakpoints":
+        corners = np.array([p for _, _, params in terms for p in params] + [0, upper])
+        points = np.concatenate([corners - 1, corners, corners + 1])
+        return np.unique(np.clip(points, 0, upper)).astype(np.float64)
+    if isinstance(resolution, int) and resolution > 1:
+        return np.linspace(0, upper, resolution)
+    raise ValueError(f"Resolusi universe tidak dikenal untuk {label}: {resolution!r}")
+
+
+def create_variables(resolution=None):
+    """
+    Fungsi untuk membuat variabel input/output beserta fungsi keanggotaannya.
+    Mengembalikan (pm25, pm10, co, no2, o3, so2, aqi).
+
+    ``resolution`` berupa satu pengaturan untuk semua variabel, atau dict
+    {label: pengaturan}; lihat make_universe.
+    """
+    import skfuzzy as fuzz
+    from skfuzzy import control as ctrl
+
+    if not isinstance(resolution, dict):
+        resolution = {label: resolution for label in MEMBERSHIP_FUNCTIONS}
+
+    variables = []
+    for label, (_, terms) in MEMBERSHIP_FUNCTIONS.items():
+        universe = make_universe(label, resolution.get(label))
+        var = ctrl.Consequent(universe, label) if label == OUTPUT_LABEL else ctrl.Antecedent(universe, label)
+        for term, func, params in terms:
+            var[term] = getattr(fuzz, func)(var.universe, params)
+        variables.append(var)
+    return tuple(variables)